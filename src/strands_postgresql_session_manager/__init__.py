@@ -23,13 +23,69 @@ Example:
     >>> agent("Hello! Tell me about PostgreSQL.")
 """
 
-from .session_manager import PostgresSessionManager
-from .models import SessionDB, AgentDB, MessageDB
+from .blobs import delete_orphaned_blobs
+from .cache import CacheInvalidationListener, SessionCache, shared_session_cache
+from .engine import create_async_session_engine, create_session_engine, json_dumps, json_loads
+from .exceptions import (
+    AgentVersionConflictError,
+    SessionLeaseLostError,
+    SessionLeaseUnavailableError,
+)
+from .lease import SessionLease
+from .migrations import (
+    add_agent_version_column,
+    add_message_payload_columns,
+    create_gin_indexes,
+    migrate_json_to_jsonb,
+)
+from .models import AgentDB, BlobDB, MessageBlobDB, MessageDB, SessionDB
+from .query_stats import QueryStats
+from .session_manager import MessagePage, PostgresSessionManager
+from .telemetry import RepositoryTelemetry
 
 __version__ = "0.1.0"
 __all__ = [
     "PostgresSessionManager",
+    "MessagePage",
     "SessionDB",
     "AgentDB",
     "MessageDB",
+    "BlobDB",
+    "MessageBlobDB",
+    "delete_orphaned_blobs",
+    "SessionCache",
+    "shared_session_cache",
+    "CacheInvalidationListener",
+    "create_gin_indexes",
+    "migrate_json_to_jsonb",
+    "add_message_payload_columns",
+    "add_agent_version_column",
+    "AgentVersionConflictError",
+    "SessionLease",
+    "SessionLeaseUnavailableError",
+    "SessionLeaseLostError",
+    "create_session_engine",
+    "create_async_session_engine",
+    "json_dumps",
+    "json_loads",
+    "RepositoryTelemetry",
+    "QueryStats",
+    "AsyncPostgresSessionManager",
+    "AsyncPostgresSessionRepository",
+    "SyncSessionRepositoryAdapter",
 ]
+
+_ASYNC_EXPORTS = {
+    "AsyncPostgresSessionManager",
+    "AsyncPostgresSessionRepository",
+    "SyncSessionRepositoryAdapter",
+}
+
+
+def __getattr__(name):
+    # The async manager needs the optional 'async' extra, so import it on first use
+    if name in _ASYNC_EXPORTS:
+        from . import async_session_manager
+
+        return getattr(async_session_manager, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
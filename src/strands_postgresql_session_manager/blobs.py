@@ -0,0 +1,153 @@
+"""
+Content-addressed storage for binary content in messages.
+
+Bytes values in message content blocks (images, documents) above a size
+threshold are stored once in the blobs table, keyed by their SHA-256, and
+the message JSON only keeps a {"__blob_ref__": "<sha256>", "size": n}
+reference. Identical files re-sent in later messages are stored once, and
+the content is kept as raw BYTEA instead of base64 inside JSONB.
+
+References are resolved when messages are read, with one query for all
+blobs referenced by the messages being read.
+"""
+
+import base64
+import hashlib
+import logging
+from typing import Any
+
+from sqlalchemy import delete, exists, select
+from sqlalchemy.engine import Engine
+from sqlmodel import col
+
+from .models import BlobDB, MessageBlobDB
+
+logger = logging.getLogger(__name__)
+
+BLOB_REF_KEY = "__blob_ref__"
+
+# (container, key, blob_hash) of a reference found while decoding a message
+BlobRef = tuple[Any, Any, str]
+
+
+def offload_blobs(obj: Any, threshold: int, blobs: dict[str, bytes]) -> Any:
+    """
+    Replace bytes values of at least threshold bytes by blob references.
+
+    Args:
+        obj: Message content (dicts, lists and scalars)
+        threshold: Minimum size in bytes of offloaded values
+        blobs: Collects the offloaded values by hash
+
+    Returns:
+        A copy of obj with large bytes values replaced by references
+    """
+    if isinstance(obj, (bytes, bytearray)):
+        if len(obj) < threshold:
+            return obj
+        blob_hash = hashlib.sha256(obj).hexdigest()
+        blobs[blob_hash] = bytes(obj)
+        return {BLOB_REF_KEY: blob_hash, "size": len(obj)}
+    elif isinstance(obj, dict):
+        return {key: offload_blobs(value, threshold, blobs) for key, value in obj.items()}
+    elif isinstance(obj, list):
+        return [offload_blobs(item, threshold, blobs) for item in obj]
+    else:
+        return obj
+
+
+def decode_message_values(obj: Any, blob_refs: list[BlobRef]) -> Any:
+    """
+    Decode base64-encoded bytes values and collect blob references.
+
+    Same as strands.types.session.decode_bytes_values, but records where
+    blob references occur so resolve_blob_refs can replace them without
+    walking the message again.
+
+    Args:
+        obj: Stored message content
+        blob_refs: Collects the blob references found in the decoded copy
+
+    Returns:
+        The decoded copy of obj
+    """
+    if isinstance(obj, dict):
+        if obj.get("__bytes_encoded__") is True and "data" in obj:
+            return base64.b64decode(obj["data"])
+
+        decoded: dict[str, Any] = {}
+        for key, value in obj.items():
+            if isinstance(value, dict) and BLOB_REF_KEY in value:
+                blob_refs.append((decoded, key, value[BLOB_REF_KEY]))
+            decoded[key] = decode_message_values(value, blob_refs)
+        return decoded
+    elif isinstance(obj, list):
+        decoded_list: list[Any] = []
+        for index, item in enumerate(obj):
+            if isinstance(item, dict) and BLOB_REF_KEY in item:
+                blob_refs.append((decoded_list, index, item[BLOB_REF_KEY]))
+            decoded_list.append(decode_message_values(item, blob_refs))
+        return decoded_list
+    else:
+        return obj
+
+
+def resolve_blob_refs(blob_refs: list[BlobRef], blobs: dict[str, bytes]) -> set[str]:
+    """
+    Replace collected blob references by the blob contents.
+
+    Args:
+        blob_refs: References collected by decode_message_values
+        blobs: Blob contents by hash
+
+    Returns:
+        Hashes of blobs that were not found (their references are kept)
+    """
+    missing = set()
+    for container, key, blob_hash in blob_refs:
+        data = blobs.get(blob_hash)
+        if data is None:
+            missing.add(blob_hash)
+        else:
+            container[key] = data
+    return missing
+
+
+def delete_orphaned_blobs(
+    engine: Engine,
+    blob_model: type[BlobDB] = BlobDB,
+    message_blob_model: type[MessageBlobDB] = MessageBlobDB,
+) -> int:
+    """
+    Delete blobs no longer referenced by any message.
+
+    Blobs stay when the messages referencing them are deleted, since other
+    messages may share them. Run this periodically, preferably at low
+    traffic: a message written concurrently that reuses a blob being deleted
+    fails on its foreign key and has to be retried.
+
+    Args:
+        engine: SQLAlchemy sync engine for database connections
+        blob_model: SQLModel class for blobs (default: BlobDB)
+        message_blob_model: SQLModel class for message blob references
+            (default: MessageBlobDB)
+
+    Returns:
+        Number of blobs deleted
+
+    Raises:
+        Exception: If database operation fails
+    """
+    statement = delete(blob_model).where(
+        ~exists(
+            select(col(message_blob_model.blob_hash)).where(
+                col(message_blob_model.blob_hash) == blob_model.blob_hash
+            )
+        )
+    )
+
+    with engine.begin() as connection:
+        deleted = connection.execute(statement).rowcount
+
+    logger.info(f"Deleted {deleted} orphaned blobs")
+    return deleted
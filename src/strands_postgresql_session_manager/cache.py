@@ -0,0 +1,423 @@
+"""
+In-process cache of sessions and agents for PostgreSQL session storage.
+
+Sessions and agents written or read by a session manager are kept in a
+bounded LRU cache, which can be shared by all session managers of the
+process. A cached entry is only returned after checking that its version
+(the row's updated_at) is still the one stored in the database, which
+reads one small column instead of the full JSONB state.
+
+With a CacheInvalidationListener, writes on other nodes evict entries via
+PostgreSQL LISTEN/NOTIFY, and cached entries are used without the version
+check while the listener is connected.
+"""
+
+import copy
+import json
+import logging
+import select
+import threading
+import uuid
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from datetime import datetime, timezone
+from typing import Any
+
+from sqlalchemy.engine import Engine
+
+DEFAULT_NOTIFY_CHANNEL = "strands_session_events"
+
+
+def timestamp_version(value: Any) -> Any:
+    """
+    Normalize an updated_at value for version comparisons.
+
+    Strands timestamps are ISO strings while the database returns datetimes,
+    naive or aware depending on the column type. Both are turned into naive
+    UTC datetimes.
+
+    Args:
+        value: ISO timestamp string or datetime
+
+    Returns:
+        Naive UTC datetime (other values are returned unchanged)
+    """
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value)
+        except ValueError:
+            return value
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _is_newer(version: Any, current: Any) -> bool:
+    """Whether version is newer than current; versions that cannot be compared count as newer."""
+    try:
+        return bool(version > current)
+    except TypeError:
+        return True
+
+
+class SessionCache:
+    """
+    Thread-safe bounded LRU cache of versioned objects.
+
+    Objects are copied on the way in and out, so callers can modify what
+    they get without affecting the cache.
+
+    Every invalidation increments generation. Callers that read from the
+    database pass the generation seen before the read to put(), so a result
+    read before a concurrent invalidation is not cached. An entry is only
+    replaced by a newer version, so concurrent writers storing their results
+    out of commit order cannot leave an older version cached.
+
+    Attributes:
+        max_size: Maximum number of cached entries
+        hits: Number of lookups that found an entry
+        misses: Number of lookups that found nothing
+        synchronized: True while a CacheInvalidationListener delivers
+            invalidations, so entries need no version check
+        origin: Identifies the notifications of writes made through this
+            cache, which already updated it
+    """
+
+    def __init__(self, max_size: int = 1024):
+        """
+        Initialize SessionCache.
+
+        Args:
+            max_size: Maximum number of cached entries (default: 1024)
+
+        Raises:
+            ValueError: If max_size is not positive
+        """
+        if max_size < 1:
+            raise ValueError("max_size must be a positive integer")
+
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.synchronized = False
+        self.origin = uuid.uuid4().hex
+        self._generation = 0
+        self._entries: OrderedDict[Hashable, tuple[Any, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def generation(self) -> int:
+        """Counter incremented by every invalidation."""
+        return self._generation
+
+    def get(self, key: Hashable) -> tuple[Any, Any] | None:
+        """
+        Look up an entry and mark it as recently used.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            (version, copy of the object) if cached, None otherwise
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+        version, value = entry
+        return version, copy.deepcopy(value)
+
+    def put(self, key: Hashable, version: Any, value: Any, generation: int | None = None) -> None:
+        """
+        Store an entry, evicting the least recently used one if full.
+
+        Args:
+            key: Cache key
+            version: Version of the object (e.g. its updated_at); an entry
+                with the same or a newer version is kept instead, while one
+                with a version of another type is replaced
+            value: Object to cache (a copy is stored)
+            generation: Generation seen before value was read or written; the
+                entry is not stored if an invalidation happened since
+        """
+        entry = (version, copy.deepcopy(value))
+
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            current = self._entries.get(key)
+            if current is not None and not _is_newer(version, current[0]):
+                return
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        """
+        Remove an entry if present.
+
+        Args:
+            key: Cache key
+        """
+        with self._lock:
+            self._generation += 1
+            self._entries.pop(key, None)
+
+    def invalidate_matching(self, predicate: Callable[[Any], bool]) -> None:
+        """
+        Remove all entries whose key matches predicate.
+
+        Args:
+            predicate: Function returning True for keys to remove
+        """
+        with self._lock:
+            self._generation += 1
+            for key in [key for key in self._entries if predicate(key)]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+
+_shared_cache: SessionCache | None = None
+_shared_cache_lock = threading.Lock()
+
+
+def shared_session_cache() -> SessionCache:
+    """
+    Return the process-wide session cache, creating it on first use.
+
+    Returns:
+        The SessionCache shared by all session managers using it
+    """
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = SessionCache()
+        return _shared_cache
+
+
+def cache_event_payload(
+    kind: str,
+    session_id: str | None = None,
+    agent_id: str | None = None,
+    origin: str | None = None,
+) -> str:
+    """
+    Build the NOTIFY payload announcing a write.
+
+    Args:
+        kind: What was written: "session", "agent" or "message"
+        session_id: Session of the written row (None = any session)
+        agent_id: Agent of the written row, if any
+        origin: SessionCache.origin of the writer's cache, if it has one
+
+    Returns:
+        JSON payload
+    """
+    return json.dumps(
+        {"kind": kind, "session_id": session_id, "agent_id": agent_id, "origin": origin}
+    )
+
+
+def evict_for_event(cache: SessionCache, event: dict[str, Any]) -> None:
+    """
+    Evict the cache entries affected by a write announced by event.
+
+    Entries of every database and table namespace are matched, since the
+    writer may reach the same database through a different URL.
+
+    Args:
+        cache: Cache to evict from
+        event: Decoded NOTIFY payload (see cache_event_payload)
+    """
+    kind = event.get("kind")
+    session_id = event.get("session_id")
+    agent_id = event.get("agent_id")
+
+    if kind == "session":
+        # The session and all of its agents
+        cache.invalidate_matching(lambda key: key[2] == session_id)
+    elif kind == "agent":
+        cache.invalidate_matching(
+            lambda key: key[1] == "agent"
+            and key[3] == agent_id
+            and (session_id is None or key[2] == session_id)
+        )
+
+
+class CacheInvalidationListener:
+    """
+    Background thread evicting cache entries changed by other processes.
+
+    Listens on the NOTIFY channel that session managers created with the
+    same notify_channel write to, on a dedicated connection outside the
+    engine's pool. While connected the cache is marked synchronized; after
+    a connection loss the cache is cleared, since notifications may have
+    been missed, and the listener reconnects.
+
+    Every process writing to the database must use notify_channel for
+    synchronized caches to be safe.
+
+    Attributes:
+        engine: SQLAlchemy sync engine using the psycopg2 driver
+        cache: Cache to keep up to date
+        channel: NOTIFY channel name
+        logger: Logger instance for this listener
+
+    Example:
+        >>> cache = shared_session_cache()
+        >>> listener = CacheInvalidationListener(engine, cache).start()
+        >>> session_manager = PostgresSessionManager(
+        ...     session_id="user_123",
+        ...     engine=engine,
+        ...     cache=cache,
+        ...     notify_channel=listener.channel,
+        ... )
+    """
+
+    def __init__(
+        self,
+        engine: Engine,
+        cache: SessionCache,
+        channel: str = DEFAULT_NOTIFY_CHANNEL,
+        poll_interval: float = 5.0,
+        retry_interval: float = 5.0,
+        logger: logging.Logger | None = None,
+    ):
+        """
+        Initialize CacheInvalidationListener.
+
+        Args:
+            engine: SQLAlchemy sync engine using the psycopg2 driver
+            cache: Cache to keep up to date
+            channel: NOTIFY channel name (default: DEFAULT_NOTIFY_CHANNEL)
+            poll_interval: Seconds between checks for stop() while idle (default: 5.0)
+            retry_interval: Seconds to wait before reconnecting (default: 5.0)
+            logger: Custom logger instance (default: module logger)
+        """
+        self.engine = engine
+        self.cache = cache
+        self.channel = channel
+        self.poll_interval = poll_interval
+        self.retry_interval = retry_interval
+        self.logger = logger or logging.getLogger(__name__)
+        self._callbacks: list[Callable[[dict[str, Any]], None]] = []
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def add_callback(self, callback: Callable[[dict[str, Any]], None]) -> None:
+        """
+        Call callback with every event of writes not made through the cache.
+
+        Args:
+            callback: Function taking the decoded payload (see cache_event_payload)
+        """
+        self._callbacks.append(callback)
+
+    def start(self) -> "CacheInvalidationListener":
+        """
+        Start the listener thread.
+
+        Returns:
+            The listener itself
+        """
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="postgres-session-cache-listener", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: float | None = None) -> None:
+        """
+        Stop the listener thread and mark the cache unsynchronized.
+
+        Args:
+            timeout: Seconds to wait for the thread to exit (default: poll_interval)
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(self.poll_interval if timeout is None else timeout)
+        self.cache.synchronized = False
+
+    def handle_payload(self, payload: str) -> None:
+        """
+        Apply one notification payload.
+
+        Args:
+            payload: NOTIFY payload (see cache_event_payload)
+        """
+        try:
+            event = json.loads(payload)
+        except ValueError:
+            self.logger.warning(f"Ignoring malformed cache notification: {payload!r}")
+            return
+
+        # Writes made through this cache already updated it; those of other
+        # managers, in this process or not, must evict
+        if event.get("origin") == self.cache.origin:
+            return
+
+        evict_for_event(self.cache, event)
+        for callback in self._callbacks:
+            try:
+                callback(event)
+            except Exception:
+                self.logger.exception("Error in cache notification callback")
+
+    def _run(self) -> None:
+        """Listen until stopped, reconnecting after errors."""
+        while not self._stop.is_set():
+            try:
+                self._listen()
+            except Exception:
+                self.logger.exception("Cache listener connection lost")
+            finally:
+                # Notifications may have been missed
+                self.cache.synchronized = False
+                self.cache.clear()
+
+            self._stop.wait(self.retry_interval)
+
+    def _listen(self) -> None:
+        """Hold one LISTEN connection, applying notifications until stopped."""
+        connection = self.engine.raw_connection()
+        # Keep the long-lived connection out of the engine's pool
+        connection.detach()
+        # psycopg2 connection; poll() and notifies are not part of the DBAPI
+        dbapi_connection: Any = connection.dbapi_connection
+
+        try:
+            dbapi_connection.autocommit = True
+            with dbapi_connection.cursor() as cursor:
+                channel = self.engine.dialect.identifier_preparer.quote(self.channel)
+                cursor.execute(f"LISTEN {channel}")
+
+            # Entries cached before listening may already be stale
+            self.cache.clear()
+            self.cache.synchronized = True
+            self.logger.info(f"Listening for cache invalidations on {self.channel}")
+
+            while not self._stop.is_set():
+                readable, _, _ = select.select([dbapi_connection], [], [], self.poll_interval)
+                if not readable:
+                    continue
+
+                dbapi_connection.poll()
+                while dbapi_connection.notifies:
+                    self.handle_payload(dbapi_connection.notifies.pop(0).payload)
+        finally:
+            connection.close()
@@ -0,0 +1,125 @@
+"""
+Message payload compression for PostgreSQL session storage.
+
+Messages whose serialized JSON reaches a size threshold are stored
+zstd-compressed in the messages.payload BYTEA column, with the codec name
+in messages.payload_codec and messages.message left NULL. Smaller messages
+stay plain JSONB.
+
+Install zstandard with: pip install "strands-postgresql-session-manager[zstd]"
+"""
+
+import threading
+from typing import Any
+
+from .engine import json_dumps, json_loads
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - depends on installed extras
+    zstandard = None  # type: ignore[assignment]
+
+SUPPORTED_CODECS = ("zstd",)
+
+_local = threading.local()
+
+
+def _check_codec(codec: str) -> None:
+    """Raise if codec is unknown or its library is not installed."""
+    if codec not in SUPPORTED_CODECS:
+        raise ValueError(
+            f"Unsupported compression codec: {codec!r} (supported: {', '.join(SUPPORTED_CODECS)})"
+        )
+    if zstandard is None:
+        raise ImportError(
+            "zstd compression requires the 'zstd' extra: "
+            'pip install "strands-postgresql-session-manager[zstd]"'
+        )
+
+
+def decompress_payload(payload: bytes, codec: str) -> Any:
+    """
+    Decode a compressed message payload.
+
+    Args:
+        payload: Compressed JSON document
+        codec: Codec the payload was compressed with
+
+    Returns:
+        The decoded message document
+
+    Raises:
+        ValueError: If the codec is not supported
+        ImportError: If the codec's library is not installed
+    """
+    _check_codec(codec)
+
+    # zstd (de)compressor objects are not thread-safe; keep one per thread
+    decompressor = getattr(_local, "decompressor", None)
+    if decompressor is None:
+        decompressor = _local.decompressor = zstandard.ZstdDecompressor()
+
+    return json_loads(decompressor.decompress(bytes(payload)))
+
+
+class MessageCompressor:
+    """
+    Compresses message documents above a size threshold.
+
+    Attributes:
+        codec: Compression codec (only "zstd" is supported)
+        threshold: Serialized size in bytes from which messages are compressed
+        level: Compression level passed to the codec
+    """
+
+    def __init__(self, codec: str = "zstd", threshold: int = 8192, level: int = 3):
+        """
+        Initialize MessageCompressor.
+
+        Args:
+            codec: Compression codec (default: "zstd")
+            threshold: Serialized size in bytes from which messages are
+                compressed (default: 8192)
+            level: Compression level (default: 3)
+
+        Raises:
+            ValueError: If the codec is not supported or threshold is negative
+            ImportError: If the codec's library is not installed
+        """
+        _check_codec(codec)
+        if threshold < 0:
+            raise ValueError("threshold must not be negative")
+
+        self.codec = codec
+        self.threshold = threshold
+        self.level = level
+        self._local = threading.local()
+
+    def compress_values(self, values: dict[str, Any]) -> dict[str, Any]:
+        """
+        Move the message of a messages table row into the payload columns.
+
+        Rows below the threshold keep their message and get NULL payload
+        columns, so updates clear a previously compressed payload.
+
+        Args:
+            values: Row values with a "message" key (modified in place)
+
+        Returns:
+            The row values
+        """
+        document = json_dumps(values["message"]).encode()
+
+        if len(document) < self.threshold:
+            values["payload"] = None
+            values["payload_codec"] = None
+            return values
+
+        compressor = getattr(self._local, "compressor", None)
+        if compressor is None:
+            compressor = self._local.compressor = zstandard.ZstdCompressor(level=self.level)
+
+        values["message"] = None
+        values["payload"] = compressor.compress(document)
+        values["payload_codec"] = self.codec
+        return values
@@ -0,0 +1,89 @@
+"""
+Exceptions raised by the PostgreSQL session managers.
+"""
+
+from strands.types.exceptions import SessionException
+
+
+class AgentVersionConflictError(SessionException):
+    """
+    Raised when an agent was updated by someone else since it was read.
+
+    Raised by update_agent with optimistic locking enabled. Nothing was
+    written; re-read the agent (e.g. with a new session manager) and retry.
+
+    Attributes:
+        session_id: ID of the parent session
+        agent_id: ID of the agent
+        expected_version: Version the update was based on
+        actual_version: Version currently stored (None if unknown)
+    """
+
+    def __init__(
+        self,
+        session_id: str,
+        agent_id: str,
+        expected_version: int,
+        actual_version: int | None = None,
+    ):
+        """
+        Initialize AgentVersionConflictError.
+
+        Args:
+            session_id: ID of the parent session
+            agent_id: ID of the agent
+            expected_version: Version the update was based on
+            actual_version: Version currently stored (None if unknown)
+        """
+        self.session_id = session_id
+        self.agent_id = agent_id
+        self.expected_version = expected_version
+        self.actual_version = actual_version
+        super().__init__(
+            f"Agent {agent_id} in session {session_id} was modified concurrently "
+            f"(expected version {expected_version}, found {actual_version})"
+        )
+
+
+class SessionLeaseUnavailableError(SessionException):
+    """
+    Raised when a session lease could not be acquired in time.
+
+    Attributes:
+        session_id: ID of the session
+        timeout: Seconds waited for the lease
+    """
+
+    def __init__(self, session_id: str, timeout: float | None = None):
+        """
+        Initialize SessionLeaseUnavailableError.
+
+        Args:
+            session_id: ID of the session
+            timeout: Seconds waited for the lease
+        """
+        self.session_id = session_id
+        self.timeout = timeout
+        super().__init__(f"Lease on session {session_id} not acquired within {timeout}s")
+
+
+class SessionLeaseLostError(SessionException):
+    """
+    Raised when a session lease is no longer held, e.g. after a lost connection.
+
+    Another worker may have acquired the lease since; work done under the
+    lost lease should not be committed.
+
+    Attributes:
+        session_id: ID of the session
+    """
+
+    def __init__(self, session_id: str):
+        """
+        Initialize SessionLeaseLostError.
+
+        Args:
+            session_id: ID of the session
+        """
+        self.session_id = session_id
+        super().__init__(f"Lease on session {session_id} is not held")
@@ -0,0 +1,254 @@
+"""
+Session leases on PostgreSQL advisory locks.
+
+A lease gives one worker exclusive use of a session, e.g. to run at most one
+agent invocation per session across a fleet. It holds a session-level
+advisory lock keyed by a 64-bit hash of the session id on a dedicated
+connection, which PostgreSQL releases by itself if the connection or the
+worker dies, so an abandoned lease never has to expire.
+"""
+
+import hashlib
+import logging
+import sys
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import OperationalError
+
+from .exceptions import SessionLeaseLostError, SessionLeaseUnavailableError
+
+if sys.version_info >= (3, 11):
+    from typing import Self
+else:
+    # Installed with SQLAlchemy
+    from typing_extensions import Self
+
+DEFAULT_LEASE_NAMESPACE = "strands_session"
+
+# SQLSTATE of lock waits cancelled by lock_timeout
+_LOCK_NOT_AVAILABLE = "55P03"
+
+
+def lease_key(session_id: str, namespace: str = DEFAULT_LEASE_NAMESPACE) -> int:
+    """
+    Compute the advisory lock key of a session.
+
+    Args:
+        session_id: ID of the session
+        namespace: Prefix separating these keys from other advisory locks
+            used by the application (default: DEFAULT_LEASE_NAMESPACE)
+
+    Returns:
+        Signed 64-bit advisory lock key
+    """
+    digest = hashlib.blake2b(f"{namespace}:{session_id}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+class SessionLease:
+    """
+    Exclusive lease on a session, held as a PostgreSQL advisory lock.
+
+    The lock is held by a pooled connection checked out for the lifetime of
+    the lease and kept in autocommit mode, so no transaction stays open while
+    the lease is held. Size the engine's pool for one extra connection per
+    concurrently held lease.
+
+    Attributes:
+        engine: SQLAlchemy sync engine for database connections
+        session_id: ID of the leased session
+        key: Advisory lock key of the session
+        logger: Logger instance for this lease
+
+    Example:
+        >>> with SessionLease(engine, "user_123").acquire(timeout=5):
+        ...     agent("Hello!")
+    """
+
+    def __init__(
+        self,
+        engine: Engine,
+        session_id: str,
+        namespace: str = DEFAULT_LEASE_NAMESPACE,
+        logger: logging.Logger | None = None,
+    ):
+        """
+        Initialize SessionLease.
+
+        Args:
+            engine: SQLAlchemy sync engine for database connections
+            session_id: ID of the session to lease
+            namespace: Advisory lock key namespace, see lease_key
+                (default: DEFAULT_LEASE_NAMESPACE)
+            logger: Custom logger instance (default: creates new logger)
+        """
+        self.engine = engine
+        self.session_id = session_id
+        self.key = lease_key(session_id, namespace)
+        self.logger = logger or logging.getLogger(__name__)
+        self._connection: Connection | None = None
+
+    @property
+    def held(self) -> bool:
+        """Whether this lease was acquired and not released (see renew())."""
+        return self._connection is not None
+
+    def __enter__(self) -> Self:
+        if not self.held:
+            self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.release()
+
+    def try_acquire(self) -> bool:
+        """
+        Acquire the lease if no one else holds it, without waiting.
+
+        Returns:
+            True if the lease is now held, False if another worker holds it
+
+        Raises:
+            Exception: If database operation fails
+        """
+        if self.held:
+            return True
+
+        connection = self._connect()
+        try:
+            acquired = connection.execute(
+                text("SELECT pg_try_advisory_lock(:key)"), {"key": self.key}
+            ).scalar_one()
+        except Exception:
+            connection.close()
+            raise
+
+        if not acquired:
+            connection.close()
+            return False
+
+        self._connection = connection
+        self.logger.debug(f"Lease acquired: {self.session_id}")
+        return True
+
+    def acquire(self, timeout: float | None = None) -> "SessionLease":
+        """
+        Acquire the lease, waiting for the current holder to release it.
+
+        Waiters are queued by PostgreSQL instead of polling.
+
+        Args:
+            timeout: Maximum seconds to wait (default: None = wait forever)
+
+        Returns:
+            The lease itself, usable as a context manager
+
+        Raises:
+            SessionLeaseUnavailableError: If timeout expired before the lease
+                could be acquired
+            Exception: If database operation fails
+        """
+        if self.held:
+            return self
+
+        connection = self._connect()
+        timeout_set = False
+        try:
+            if timeout is not None:
+                connection.execute(
+                    text("SELECT set_config('lock_timeout', :timeout, false)"),
+                    {"timeout": f"{max(int(timeout * 1000), 1)}ms"},
+                )
+                timeout_set = True
+            try:
+                connection.execute(text("SELECT pg_advisory_lock(:key)"), {"key": self.key})
+            except OperationalError as e:
+                if getattr(e.orig, "pgcode", None) == _LOCK_NOT_AVAILABLE:
+                    raise SessionLeaseUnavailableError(self.session_id, timeout) from e
+                raise
+            finally:
+                # Also after a failure: the connection goes back to the pool
+                if timeout_set:
+                    connection.execute(text("RESET lock_timeout"))
+                    timeout_set = False
+        except Exception:
+            if timeout_set:
+                # lock_timeout is still set, keep the connection out of the pool
+                connection.invalidate()
+            connection.close()
+            raise
+
+        self._connection = connection
+        self.logger.debug(f"Lease acquired: {self.session_id}")
+        return self
+
+    def renew(self) -> None:
+        """
+        Check that the lease is still held.
+
+        Advisory locks do not expire, so a lease is only lost with its
+        connection. Call this before committing work done under the lease,
+        e.g. after a long model call.
+
+        Raises:
+            SessionLeaseLostError: If the lease was not acquired or its
+                connection was lost (the lock is then released)
+        """
+        if self._connection is None:
+            raise SessionLeaseLostError(self.session_id)
+
+        try:
+            held = self._connection.execute(
+                text(
+                    "SELECT EXISTS (SELECT 1 FROM pg_locks WHERE locktype = 'advisory' "
+                    "AND pid = pg_backend_pid() AND granted "
+                    "AND classid = :classid AND objid = :objid AND objsubid = 1)"
+                ),
+                {"classid": (self.key >> 32) & 0xFFFFFFFF, "objid": self.key & 0xFFFFFFFF},
+            ).scalar_one()
+        except Exception as e:
+            self.logger.error(f"Error renewing lease: {e}")
+            self._discard()
+            raise SessionLeaseLostError(self.session_id) from e
+
+        if not held:
+            self._discard()
+            raise SessionLeaseLostError(self.session_id)
+
+    def release(self) -> None:
+        """
+        Release the lease. Does nothing if it is not held.
+
+        If unlocking fails the connection is discarded instead of returned
+        to the pool, which releases the lock as well.
+        """
+        if self._connection is None:
+            return
+
+        try:
+            self._connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": self.key})
+        except Exception:
+            self.logger.warning("Error releasing lease, discarding its connection", exc_info=True)
+            self._discard()
+            return
+
+        self._connection.close()
+        self._connection = None
+        self.logger.debug(f"Lease released: {self.session_id}")
+
+    def _connect(self) -> Connection:
+        """Check out a connection that does not keep transactions open."""
+        return self.engine.connect().execution_options(isolation_level="AUTOCOMMIT")
+
+    def _discard(self) -> None:
+        """Close the lease connection without returning it to the pool."""
+        if self._connection is None:
+            return
+        try:
+            self._connection.invalidate()
+            self._connection.close()
+        except Exception:
+            # The connection is already unusable, and with it the lock
+            self.logger.debug("Error discarding lease connection", exc_info=True)
+        self._connection = None
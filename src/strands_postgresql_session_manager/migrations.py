@@ -0,0 +1,293 @@
+"""
+Schema migration helpers for PostgreSQL session storage.
+
+Helpers for upgrading existing deployments in place. Every helper is
+idempotent and can safely be run on each application start.
+"""
+
+import logging
+from collections.abc import Iterable
+from typing import Any
+
+from sqlalchemy import Column, DefaultClause, Table, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel import SQLModel
+
+from .models import AgentDB, MessageDB
+
+logger = logging.getLogger(__name__)
+
+# Whether messages tables have the payload columns, by (database URL, table name)
+_payload_columns: dict[tuple[str, str], bool] = {}
+
+
+def migrate_json_to_jsonb(
+    engine: Engine,
+    models: Iterable[type[SQLModel]] = (AgentDB, MessageDB),
+) -> list[str]:
+    """
+    Convert columns created as plain JSON to JSONB.
+
+    Earlier releases declared the state and message columns with the generic
+    JSON type, which PostgreSQL stores as text. This converts every column
+    that the given models declare as JSONB but that is still `json` in the
+    database, all in one transaction.
+
+    Args:
+        engine: SQLAlchemy sync engine for database connections
+        models: SQLModel table classes to migrate (default: AgentDB, MessageDB)
+
+    Returns:
+        Converted columns as "table.column" strings (empty if already migrated)
+
+    Raises:
+        Exception: If database operation fails
+
+    Note:
+        ALTER COLUMN ... TYPE rewrites the table and holds an ACCESS EXCLUSIVE
+        lock while doing so. Run it during a maintenance window on large tables.
+    """
+    migrated = []
+    preparer = engine.dialect.identifier_preparer
+
+    with engine.begin() as connection:
+        for model in models:
+            table = _table(model)
+
+            for column in table.columns:
+                if not isinstance(column.type, JSONB):
+                    continue
+
+                data_type = connection.execute(
+                    text(
+                        "SELECT data_type FROM information_schema.columns "
+                        "WHERE table_schema = current_schema() "
+                        "AND table_name = :table_name AND column_name = :column_name"
+                    ),
+                    {"table_name": table.name, "column_name": column.name},
+                ).scalar_one_or_none()
+
+                if data_type != "json":
+                    continue
+
+                quoted_column = preparer.quote(column.name)
+                connection.execute(
+                    text(
+                        f"ALTER TABLE {preparer.format_table(table)} "
+                        f"ALTER COLUMN {quoted_column} TYPE JSONB USING {quoted_column}::jsonb"
+                    )
+                )
+                migrated.append(f"{table.name}.{column.name}")
+                logger.info(f"Column migrated to JSONB: {table.name}.{column.name}")
+
+    return migrated
+
+
+def create_gin_indexes(
+    engine: Engine,
+    columns: Iterable[Column] | None = None,
+    path_ops: bool = True,
+    concurrently: bool = False,
+) -> list[str]:
+    """
+    Create GIN indexes on JSONB columns.
+
+    GIN indexes let PostgreSQL answer containment queries such as
+    `state @> '{"tier": "pro"}'` without a sequential scan. They are not part
+    of the table definitions because every index slows down writes; create
+    only the ones your queries need.
+
+    Args:
+        engine: SQLAlchemy sync engine for database connections
+        columns: JSONB columns to index (default: AgentDB.state)
+        path_ops: Use the jsonb_path_ops operator class, which is smaller and
+            faster but only supports @> containment (default: True)
+        concurrently: Build with CREATE INDEX CONCURRENTLY so writes are not
+            blocked, at the cost of a slower build (default: False)
+
+    Returns:
+        Names of the indexes (existing indexes are left untouched)
+
+    Raises:
+        Exception: If database operation fails
+    """
+    if columns is None:
+        columns = [_table(AgentDB).c.state]
+
+    index_names = []
+    preparer = engine.dialect.identifier_preparer
+    operator_class = " jsonb_path_ops" if path_ops else ""
+
+    with engine.connect() as connection:
+        if concurrently:
+            # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+            connection = connection.execution_options(isolation_level="AUTOCOMMIT")
+
+        for column in columns:
+            index_name = f"ix_{column.table.name}_{column.name}_gin"
+
+            connection.execute(
+                text(
+                    f"CREATE INDEX {'CONCURRENTLY ' if concurrently else ''}IF NOT EXISTS "
+                    f"{preparer.quote(index_name)} ON {preparer.format_table(column.table)} "
+                    f"USING GIN ({preparer.quote(column.name)}{operator_class})"
+                )
+            )
+            index_names.append(index_name)
+            logger.info(f"GIN index ensured: {index_name}")
+
+        connection.commit()
+
+    return index_names
+
+
+def _table(model: type[SQLModel]) -> Table:
+    """Table of a SQLModel table class."""
+    table: Table = model.__table__  # type: ignore[attr-defined]
+    return table
+
+
+def _existing_columns(connection: Any, table_name: str) -> set[str]:
+    """Return the names of the columns a table has in the database."""
+    return set(
+        connection.execute(
+            text(
+                "SELECT column_name FROM information_schema.columns "
+                "WHERE table_schema = current_schema() AND table_name = :table_name"
+            ),
+            {"table_name": table_name},
+        ).scalars()
+    )
+
+
+def has_message_payload_columns(engine: Engine, model: type[SQLModel] = MessageDB) -> bool:
+    """
+    Tell whether the messages table has the payload columns used by compression.
+
+    The answer is looked up once per database and table, then cached.
+
+    Args:
+        engine: SQLAlchemy sync engine for database connections
+        model: SQLModel message table class (default: MessageDB)
+
+    Returns:
+        True if the payload and payload_codec columns exist
+
+    Raises:
+        Exception: If database operation fails
+    """
+    table_name = _table(model).name
+    key = (str(engine.url), table_name)
+    if key not in _payload_columns:
+        with engine.connect() as connection:
+            existing = _existing_columns(connection, table_name)
+        _payload_columns[key] = {"payload", "payload_codec"} <= existing
+    return _payload_columns[key]
+
+
+async def async_has_message_payload_columns(
+    engine: AsyncEngine, model: type[SQLModel] = MessageDB
+) -> bool:
+    """Async variant of has_message_payload_columns, sharing its cache."""
+    table_name = _table(model).name
+    key = (str(engine.url), table_name)
+    if key not in _payload_columns:
+        async with engine.connect() as connection:
+            existing = await connection.run_sync(_existing_columns, table_name)
+        _payload_columns[key] = {"payload", "payload_codec"} <= existing
+    return _payload_columns[key]
+
+
+def _add_missing_columns(connection: Any, engine: Engine, columns: Iterable[Column]) -> list[str]:
+    """
+    Add the columns of one table that do not exist in the database yet.
+
+    Columns are added with their type, NOT NULL constraint and server default.
+
+    Returns:
+        Added columns as "table.column" strings
+    """
+    added = []
+    columns = list(columns)
+    table = columns[0].table
+    preparer = engine.dialect.identifier_preparer
+    quoted_table = preparer.format_table(table)
+
+    existing = _existing_columns(connection, table.name)
+
+    for column in columns:
+        if column.name in existing:
+            continue
+
+        definition = column.type.compile(dialect=engine.dialect)
+        if not column.nullable:
+            definition += " NOT NULL"
+        if isinstance(column.server_default, DefaultClause):
+            definition += f" DEFAULT {column.server_default.arg}"
+
+        connection.execute(
+            text(
+                f"ALTER TABLE {quoted_table} ADD COLUMN {preparer.quote(column.name)} {definition}"
+            )
+        )
+        added.append(f"{table.name}.{column.name}")
+        logger.info(f"Column added: {table.name}.{column.name}")
+
+    return added
+
+
+def add_message_payload_columns(engine: Engine, model: type[SQLModel] = MessageDB) -> list[str]:
+    """
+    Add the columns used by message compression to an existing messages table.
+
+    Adds the payload and payload_codec columns and makes the message column
+    nullable, since compressed messages keep their content in payload.
+
+    Args:
+        engine: SQLAlchemy sync engine for database connections
+        model: SQLModel message table class (default: MessageDB)
+
+    Returns:
+        Added columns as "table.column" strings (empty if already migrated)
+
+    Raises:
+        Exception: If database operation fails
+    """
+    table = _table(model)
+    preparer = engine.dialect.identifier_preparer
+
+    with engine.begin() as connection:
+        added = _add_missing_columns(connection, engine, (table.c.payload, table.c.payload_codec))
+
+        connection.execute(
+            text(
+                f"ALTER TABLE {preparer.format_table(table)} "
+                f"ALTER COLUMN {preparer.quote(table.c.message.name)} DROP NOT NULL"
+            )
+        )
+
+    _payload_columns[(str(engine.url), table.name)] = True
+    return added
+
+
+def add_agent_version_column(engine: Engine, model: type[SQLModel] = AgentDB) -> list[str]:
+    """
+    Add the version column used by optimistic locking to an existing agents table.
+
+    Existing agents start at version 1. On PostgreSQL 11+ adding a column
+    with a constant default does not rewrite the table.
+
+    Args:
+        engine: SQLAlchemy sync engine for database connections
+        model: SQLModel agent table class (default: AgentDB)
+
+    Returns:
+        Added columns as "table.column" strings (empty if already migrated)
+
+    Raises:
+        Exception: If database operation fails
+    """
+    with engine.begin() as connection:
+        return _add_missing_columns(connection, engine, (_table(model).c.version,))
@@ -6,9 +6,10 @@ sessions, agents, and messages with full ACID guarantees.
 """
 
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Any
 from sqlmodel import Field, SQLModel, Column
-from sqlalchemy import JSON, ForeignKey
+from sqlalchemy import ForeignKey, ForeignKeyConstraint, Integer, LargeBinary, text
+from sqlalchemy.dialects.postgresql import JSONB
 
 
 class SessionDB(SQLModel, table=True):
@@ -67,6 +68,7 @@ class AgentDB(SQLModel, table=True):
         internal_state: Internal agent state stored as JSONB (nullable)
         created_at: Timestamp when agent was created
         updated_at: Timestamp of last agent update
+        version: Row version incremented by updates with optimistic locking
 
     Schema:
         CREATE TABLE agents (
@@ -77,6 +79,7 @@ class AgentDB(SQLModel, table=True):
             _internal_state JSONB,
             created_at TIMESTAMP NOT NULL DEFAULT NOW(),
             updated_at TIMESTAMP NOT NULL DEFAULT NOW(),
+            version INTEGER NOT NULL DEFAULT 1,
             PRIMARY KEY (session_id, agent_id),
             FOREIGN KEY (session_id) REFERENCES sessions(session_id) ON DELETE CASCADE
         );
@@ -94,20 +97,20 @@ class AgentDB(SQLModel, table=True):
     agent_id: str = Field(primary_key=True, max_length=255, description="Unique agent identifier")
 
     # JSONB fields for agent state
-    state: Dict[str, Any] = Field(
-        default_factory=dict, sa_column=Column(JSON), description="Agent state as JSON"
+    state: dict[str, Any] = Field(
+        default_factory=dict, sa_column=Column(JSONB), description="Agent state as JSONB"
     )
 
-    conversation_manager_state: Dict[str, Any] = Field(
+    conversation_manager_state: dict[str, Any] = Field(
         default_factory=dict,
-        sa_column=Column(JSON),
-        description="Conversation manager state as JSON",
+        sa_column=Column(JSONB),
+        description="Conversation manager state as JSONB",
     )
 
-    internal_state: Optional[Dict[str, Any]] = Field(
+    internal_state: dict[str, Any] | None = Field(
         default=None,
-        sa_column=Column("_internal_state", JSON, nullable=True),
-        description="Internal agent state as JSON",
+        sa_column=Column("_internal_state", JSONB, nullable=True),
+        description="Internal agent state as JSONB",
     )
 
     created_at: datetime = Field(
@@ -118,6 +121,13 @@ class AgentDB(SQLModel, table=True):
         default_factory=datetime.utcnow, description="Last update timestamp"
     )
 
+    # Compare-and-set version (only used with optimistic locking)
+    version: int = Field(
+        default=1,
+        sa_column=Column(Integer, nullable=False, server_default=text("1")),
+        description="Row version",
+    )
+
 
 class MessageDB(SQLModel, table=True):
     """
@@ -130,8 +140,10 @@ class MessageDB(SQLModel, table=True):
         session_id: Foreign key to sessions table (part of composite PRIMARY KEY)
         agent_id: Foreign key to agents table (part of composite PRIMARY KEY)
         message_id: Sequential message identifier (part of composite PRIMARY KEY)
-        message: Message content stored as JSONB
+        message: Message content stored as JSONB (NULL when stored in payload)
         redact_message: Redacted message content stored as JSONB (nullable)
+        payload: Compressed message content (nullable, see compression)
+        payload_codec: Codec of payload, e.g. 'zstd' (nullable)
         created_at: Timestamp when message was created
         updated_at: Timestamp of last message update
 
@@ -140,8 +152,10 @@ class MessageDB(SQLModel, table=True):
             session_id VARCHAR(255) NOT NULL,
             agent_id VARCHAR(255) NOT NULL,
             message_id INTEGER NOT NULL,
-            message JSONB NOT NULL,
+            message JSONB,
             redact_message JSONB,
+            payload BYTEA,
+            payload_codec VARCHAR(16),
             created_at TIMESTAMP NOT NULL DEFAULT NOW(),
             updated_at TIMESTAMP NOT NULL DEFAULT NOW(),
             PRIMARY KEY (session_id, agent_id, message_id),
@@ -166,12 +180,23 @@ class MessageDB(SQLModel, table=True):
     )
 
     # JSONB fields for message content
-    message: Dict[str, Any] = Field(sa_column=Column(JSON), description="Message content as JSON")
+    message: dict[str, Any] = Field(sa_column=Column(JSONB), description="Message content as JSONB")
+
+    redact_message: dict[str, Any] | None = Field(
+        default=None,
+        sa_column=Column(JSONB, nullable=True),
+        description="Redacted message content as JSONB (optional)",
+    )
 
-    redact_message: Optional[Dict[str, Any]] = Field(
+    # Compressed message content (message is NULL when set)
+    payload: bytes | None = Field(
         default=None,
-        sa_column=Column(JSON, nullable=True),
-        description="Redacted message content as JSON (optional)",
+        sa_column=Column(LargeBinary, nullable=True),
+        description="Compressed message content (optional)",
+    )
+
+    payload_codec: str | None = Field(
+        default=None, max_length=16, description="Codec of payload, e.g. 'zstd' (optional)"
     )
 
     created_at: datetime = Field(
@@ -181,3 +206,89 @@ class MessageDB(SQLModel, table=True):
     updated_at: datetime = Field(
         default_factory=datetime.utcnow, description="Last update timestamp"
     )
+
+
+class BlobDB(SQLModel, table=True):
+    """
+    Blob database model for binary message content.
+
+    Maps to the 'blobs' table in PostgreSQL.
+    Stores bytes offloaded from message content blocks once per content hash.
+
+    Attributes:
+        blob_hash: SHA-256 of the content as hex (PRIMARY KEY)
+        data: Raw content
+        size: Content size in bytes
+        created_at: Timestamp when the blob was first stored
+
+    Schema:
+        CREATE TABLE blobs (
+            blob_hash VARCHAR(64) PRIMARY KEY,
+            data BYTEA NOT NULL,
+            size INTEGER NOT NULL,
+            created_at TIMESTAMP NOT NULL DEFAULT NOW()
+        );
+    """
+
+    __tablename__ = "blobs"
+
+    blob_hash: str = Field(
+        primary_key=True, max_length=64, description="SHA-256 of the content (hex)"
+    )
+
+    data: bytes = Field(sa_column=Column(LargeBinary, nullable=False), description="Raw content")
+
+    size: int = Field(description="Content size in bytes")
+
+    created_at: datetime = Field(
+        default_factory=datetime.utcnow, description="Blob creation timestamp"
+    )
+
+
+class MessageBlobDB(SQLModel, table=True):
+    """
+    Message to blob reference database model.
+
+    Maps to the 'message_blobs' table in PostgreSQL.
+    Records which blobs a message references, so blobs no longer referenced
+    by any message can be deleted (see delete_orphaned_blobs).
+
+    Attributes:
+        session_id: Session of the message (part of composite PRIMARY KEY)
+        agent_id: Agent of the message (part of composite PRIMARY KEY)
+        message_id: Referencing message (part of composite PRIMARY KEY)
+        blob_hash: Referenced blob (part of composite PRIMARY KEY)
+
+    Schema:
+        CREATE TABLE message_blobs (
+            session_id VARCHAR(255) NOT NULL,
+            agent_id VARCHAR(255) NOT NULL,
+            message_id INTEGER NOT NULL,
+            blob_hash VARCHAR(64) NOT NULL REFERENCES blobs(blob_hash),
+            PRIMARY KEY (session_id, agent_id, message_id, blob_hash),
+            FOREIGN KEY (session_id, agent_id, message_id)
+                REFERENCES messages(session_id, agent_id, message_id) ON DELETE CASCADE
+        );
+    """
+
+    __tablename__ = "message_blobs"
+    __table_args__ = (
+        ForeignKeyConstraint(
+            ["session_id", "agent_id", "message_id"],
+            ["messages.session_id", "messages.agent_id", "messages.message_id"],
+            ondelete="CASCADE",
+        ),
+    )
+
+    session_id: str = Field(primary_key=True, max_length=255, description="Associated session ID")
+
+    agent_id: str = Field(primary_key=True, max_length=255, description="Associated agent ID")
+
+    message_id: int = Field(primary_key=True, description="Referencing message ID")
+
+    blob_hash: str = Field(
+        primary_key=True,
+        max_length=64,
+        foreign_key="blobs.blob_hash",
+        description="Referenced blob hash",
+    )
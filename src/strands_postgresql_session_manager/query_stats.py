@@ -0,0 +1,266 @@
+"""
+Counting of the database work done by session repository operations.
+
+Engine event listeners add every statement, database round trip, row and
+byte sent to the QueryStats active in the current context. Repository
+methods decorated with counted() activate the stats of their session manager
+while they run, so only the queries issued on behalf of the session manager
+are counted, even when the engine is shared with the rest of the application. The same
+listeners record the statements executed inside capturing_statements(),
+for the slow operation log. Bytes received are counted by the JSONB codec
+(see counting_json_bytes), which decodes the rows.
+"""
+
+import functools
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, TypeVar, cast
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .engine import counting_json_bytes
+
+
+@dataclass
+class QueryStats:
+    """
+    Database work counted while the stats were active.
+
+    Attributes:
+        statements: SQL statements executed (an executemany counts once)
+        round_trips: Requests sent to the server: cursor executions plus
+            BEGIN, COMMIT and ROLLBACK
+        rows: Rows returned or affected, as reported by the driver
+        bytes_sent: Bytes of SQL text and string or binary parameters sent
+        bytes_received: Bytes of the JSONB documents decoded from results
+            (messages and agent states, the bulk of a restore; decompressed
+            size for compressed messages). Other columns are not counted, nor
+            are documents decoded by another codec than json_loads
+        db_time: Seconds spent in cursor executions
+        operations: Number of calls per repository operation
+    """
+
+    statements: int = 0
+    round_trips: int = 0
+    rows: int = 0
+    bytes_sent: int = 0
+    bytes_received: int = 0
+    db_time: float = 0.0
+    operations: dict[str, int] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        # Tool threads of one invocation may add to the same stats
+        self._lock = threading.Lock()
+
+    def add(self, **counts: Any) -> None:
+        """Add counts to the named fields."""
+        with self._lock:
+            for name, value in counts.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    @contextmanager
+    def recording(self, operation: str | None = None) -> Iterator["QueryStats"]:
+        """
+        Count the queries issued by the current context into these stats.
+
+        Args:
+            operation: Repository operation to count a call of (default: None)
+
+        Yields:
+            These stats
+        """
+        if operation is not None:
+            with self._lock:
+                self.operations[operation] = self.operations.get(operation, 0) + 1
+        if _active_stats.get() is self:
+            # Already recording: the enclosing block counts the bytes received
+            yield self
+            return
+
+        token = _active_stats.set(self)
+        try:
+            with counting_json_bytes() as received:
+                try:
+                    yield self
+                finally:
+                    self.add(bytes_received=received.loaded)
+        finally:
+            _active_stats.reset(token)
+
+
+@dataclass
+class ExecutedStatement:
+    """
+    A statement executed inside capturing_statements().
+
+    Attributes:
+        statement: SQL sent to the driver, with driver placeholders
+        parameters: DBAPI parameters (a list of them for executemany)
+        executemany: Whether the statement ran once per parameter set
+        duration: Seconds spent in the cursor execution
+    """
+
+    statement: str
+    parameters: Any
+    executemany: bool
+    duration: float
+
+
+# Repository method wrapped by a decorator, whose signature the decorator keeps
+F = TypeVar("F", bound=Callable[..., Any])
+
+_active_stats: ContextVar[QueryStats | None] = ContextVar(
+    "postgres_session_query_stats", default=None
+)
+_active_statements: ContextVar[list[ExecutedStatement] | None] = ContextVar(
+    "postgres_session_statements", default=None
+)
+
+
+def parameter_bytes(parameters: Any) -> int:
+    """
+    Count the bytes of the string and binary values in statement parameters.
+
+    Args:
+        parameters: DBAPI parameters: a mapping, a sequence, or a sequence of
+            them for executemany
+
+    Returns:
+        Bytes of str (UTF-8) and bytes values; other values are not counted
+    """
+    if isinstance(parameters, str):
+        return len(parameters.encode())
+    if isinstance(parameters, (bytes, bytearray, memoryview)):
+        return len(parameters)
+    if isinstance(parameters, dict):
+        return sum(parameter_bytes(value) for value in parameters.values())
+    if isinstance(parameters, (list, tuple)):
+        return sum(parameter_bytes(value) for value in parameters)
+    return 0
+
+
+def _before_execute(conn, clauseelement, multiparams, params, execution_options) -> None:
+    stats = _active_stats.get()
+    if stats is not None:
+        stats.add(statements=1)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    stats = _active_stats.get()
+    if stats is None and _active_statements.get() is None:
+        return
+    if stats is not None:
+        stats.add(round_trips=1, bytes_sent=len(statement.encode()) + parameter_bytes(parameters))
+    if context is not None:
+        context._query_stats_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    stats = _active_stats.get()
+    statements = _active_statements.get()
+    if stats is None and statements is None:
+        return
+    started = getattr(context, "_query_stats_started", None)
+    duration = time.perf_counter() - started if started is not None else 0.0
+    if stats is not None:
+        stats.add(rows=max(cursor.rowcount, 0), db_time=duration)
+    if statements is not None:
+        statements.append(ExecutedStatement(statement, parameters, executemany, duration))
+
+
+def _transaction_round_trip(conn) -> None:
+    stats = _active_stats.get()
+    if stats is not None:
+        stats.add(round_trips=1)
+
+
+_LISTENERS: list[tuple[str, Callable[..., Any]]] = [
+    ("before_execute", _before_execute),
+    ("before_cursor_execute", _before_cursor_execute),
+    ("after_cursor_execute", _after_cursor_execute),
+    ("begin", _transaction_round_trip),
+    ("commit", _transaction_round_trip),
+    ("rollback", _transaction_round_trip),
+]
+
+
+def install_query_counter(engine: Engine) -> None:
+    """
+    Attach the listeners counting queries into the active QueryStats to engine.
+
+    The listeners also record the statements of capturing_statements()
+    blocks. Installing twice is a no-op. While no stats or capture are
+    active, the listeners only read context variables.
+
+    Args:
+        engine: SQLAlchemy sync engine
+    """
+    for identifier, listener in _LISTENERS:
+        if not event.contains(engine, identifier, listener):
+            event.listen(engine, identifier, listener)
+
+
+@contextmanager
+def counting(stats: QueryStats | None) -> Iterator[None]:
+    """Count the queries of the block into stats, if not None."""
+    if stats is None:
+        yield
+        return
+    with stats.recording():
+        yield
+
+
+@contextmanager
+def capturing_statements() -> Iterator[list[ExecutedStatement]]:
+    """
+    Record the statements executed by the current context in the block.
+
+    Requires install_query_counter() on the engine. Statements captured by a
+    nested block are also added to the enclosing capture.
+
+    Yields:
+        List of ExecutedStatement, filled in as the block runs
+    """
+    statements: list[ExecutedStatement] = []
+    outer = _active_statements.get()
+    token = _active_statements.set(statements)
+    try:
+        yield statements
+    finally:
+        _active_statements.reset(token)
+        if outer is not None:
+            outer.extend(statements)
+
+
+def counted(operation: str) -> Callable[[F], F]:
+    """
+    Count the queries of a sync repository method into its repository's stats.
+
+    The repository's query_stats attribute holds the active QueryStats, or
+    None to call the method without overhead.
+
+    Args:
+        operation: Operation name, counted in QueryStats.operations
+
+    Returns:
+        Decorator
+    """
+
+    def decorator(method: F) -> F:
+        @functools.wraps(method)
+        def wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:
+            query_stats = getattr(self, "query_stats", None)
+            if query_stats is None:
+                return method(self, *args, **kwargs)
+
+            with query_stats.recording(operation):
+                return method(self, *args, **kwargs)
+
+        return cast(F, wrapper)
+
+    return decorator
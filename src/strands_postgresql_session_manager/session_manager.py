@@ -5,21 +5,162 @@ Provides persistent session storage using PostgreSQL with full ACID guarantees,
 CASCADE deletes, and JSONB support for flexible state storage.
 """
 
+import copy
+import functools
 import logging
-from typing import Optional, List, Type
+import threading
+import time
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, replace
+from datetime import datetime, timezone
+from typing import Any, cast
+
+from sqlalchemy import delete, insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.engine import Engine
-from sqlmodel import Session, select
-
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlmodel import Session, col, select
+from strands.hooks import AfterInvocationEvent, BeforeInvocationEvent, HookRegistry
 from strands.session.repository_session_manager import RepositorySessionManager
 from strands.session.session_repository import SessionRepository
+from strands.types.agent import LocalAgent
 from strands.types.session import (
     Session as StrandsSession,
     SessionAgent,
     SessionMessage,
     SessionType,
+    decode_bytes_values,
+)
+
+from .blobs import BlobRef, decode_message_values, offload_blobs, resolve_blob_refs
+from .cache import SessionCache, cache_event_payload, timestamp_version
+from .compression import MessageCompressor, decompress_payload
+from .exceptions import AgentVersionConflictError
+from .lease import SessionLease
+from .migrations import has_message_payload_columns
+from .models import AgentDB, BlobDB, MessageBlobDB, MessageDB, SessionDB
+from .query_stats import QueryStats, counted, counting, install_query_counter
+from .slow_log import SlowOperationLog, slow_logged
+from .statements import (
+    _NOTIFY_STATEMENT,
+    _agent_columns,
+    delete_message_blob_links_statement,
+    insert_message_statement,
+    insert_session_statement,
+    list_messages_statement,
+    select_agent_column_statement,
+    select_agent_statement,
+    select_message_statement,
+    select_session_statement,
+    update_agent_statement,
+    update_message_statement,
 )
+from .telemetry import F, RepositoryTelemetry, default_telemetry, instrumented
+
+# Errors caused by the rows themselves, which no retry of the same rows can fix
+_REJECTED_ROW_ERRORS = (IntegrityError, DataError)
+
+
+def _operation(name: str, write: bool = False) -> Callable[[F], F]:
+    """
+    Decorate a repository method with its slow log, query stats and span, outermost first.
+
+    The slow log wraps the stats so that its EXPLAIN queries are not counted.
+    """
+
+    def decorator(method: F) -> F:
+        return slow_logged(name)(counted(name)(instrumented(name, write)(method)))
 
-from .models import SessionDB, AgentDB, MessageDB
+    return decorator
+
+
+@dataclass
+class MessagePage:
+    """
+    One page of messages read with keyset pagination.
+
+    Attributes:
+        messages: Messages in the page, in ascending message_id order
+        next_cursor: message_id to pass as after_message_id for the next page
+            (None when this is the last page)
+        previous_cursor: message_id to pass as before_message_id for the
+            previous page (None when this is the first page)
+    """
+
+    messages: list[SessionMessage]
+    next_cursor: int | None = None
+    previous_cursor: int | None = None
+
+
+def _session_agent_from_row(row: Any) -> SessionAgent:
+    """
+    Build a SessionAgent straight from a result row.
+
+    Rows are read as plain columns, so no SQLModel instance is validated and
+    dumped per row, and the constructor is called directly instead of
+    SessionAgent.from_dict, which inspects its own signature on every call.
+    """
+    return SessionAgent(
+        agent_id=row.agent_id,
+        state=decode_bytes_values(row.state),
+        conversation_manager_state=decode_bytes_values(row.conversation_manager_state),
+        _internal_state=decode_bytes_values(row.internal_state or {}),
+        created_at=row.created_at,
+        updated_at=row.updated_at,
+    )
+
+
+def _session_message_from_row(row: Any, blob_refs: list[BlobRef] | None = None) -> SessionMessage:
+    """
+    Build a SessionMessage straight from a result row (see _session_agent_from_row).
+
+    When blob_refs is given, blob references found in the message are
+    collected there to be resolved with resolve_blob_refs.
+    """
+    message = row.message
+    payload = getattr(row, "payload", None)
+    if payload is not None:
+        message = decompress_payload(payload, row.payload_codec)
+
+    decode: Callable[[Any], Any] = decode_bytes_values
+    if blob_refs is not None:
+        decode = functools.partial(decode_message_values, blob_refs=blob_refs)
+
+    redact_message = row.redact_message
+    return SessionMessage(
+        message=decode(message),
+        message_id=row.message_id,
+        redact_message=None if redact_message is None else decode(redact_message),
+        created_at=row.created_at,
+        updated_at=row.updated_at,
+    )
+
+
+def _message_page(
+    messages: list[SessionMessage],
+    limit: int,
+    after_message_id: int | None,
+    before_message_id: int | None,
+) -> MessagePage:
+    """Build a MessagePage from up to limit + 1 messages read for it (see list_messages_page)."""
+    descending = before_message_id is not None and after_message_id is None
+    has_more = len(messages) > limit
+
+    if descending:
+        messages = messages[1:] if has_more else messages
+        has_more_before, has_more_after = has_more, True
+    else:
+        messages = messages[:limit]
+        has_more_before = after_message_id is not None
+        has_more_after = has_more
+
+    return MessagePage(
+        messages=messages,
+        next_cursor=messages[-1].message_id if messages and has_more_after else None,
+        previous_cursor=messages[0].message_id if messages and has_more_before else None,
+    )
 
 
 class PostgresSessionManager(RepositorySessionManager, SessionRepository):
@@ -34,12 +175,23 @@ class PostgresSessionManager(RepositorySessionManager, SessionRepository):
     - CASCADE deletes for data integrity
     - JSONB storage for flexible state management
     - Synchronous operations (compatible with Celery and Strands SDK)
+    - Optional turn-level buffering of message writes (one INSERT per turn)
+    - Optional unit of work: one connection and transaction per invocation
 
     Attributes:
         engine: SQLAlchemy sync engine for database connections
         SessionModel: SQLModel class for sessions table (default: SessionDB)
         AgentModel: SQLModel class for agents table (default: AgentDB)
         MessageModel: SQLModel class for messages table (default: MessageDB)
+        buffer_messages: Whether create_message buffers rows until flush()
+        buffer_max_size: Buffered message count that triggers an automatic flush
+        buffer_max_age: Age in seconds of the oldest buffered message that
+            triggers an automatic flush (None = no age limit)
+        rejected_messages: Buffered message rows the database rejected, e.g.
+            for a duplicate message_id; they are not retried
+        restore_window: Number of most recent messages loaded when restoring
+            an agent whose conversation manager has not removed any messages
+            yet (None = full history)
         logger: Logger instance for this session manager
 
     Example:
@@ -64,10 +216,27 @@ class PostgresSessionManager(RepositorySessionManager, SessionRepository):
         self,
         session_id: str,
         engine: Engine,
-        session_model: Type[SessionDB] = SessionDB,
-        agent_model: Type[AgentDB] = AgentDB,
-        message_model: Type[MessageDB] = MessageDB,
-        logger: Optional[logging.Logger] = None,
+        session_model: type[SessionDB] = SessionDB,
+        agent_model: type[AgentDB] = AgentDB,
+        message_model: type[MessageDB] = MessageDB,
+        logger: logging.Logger | None = None,
+        buffer_messages: bool = False,
+        buffer_max_size: int = 50,
+        buffer_max_age: float | None = None,
+        restore_window: int | None = None,
+        compression: str | None = None,
+        compression_threshold: int = 8192,
+        compression_level: int = 3,
+        blob_threshold: int | None = None,
+        blob_model: type[BlobDB] = BlobDB,
+        message_blob_model: type[MessageBlobDB] = MessageBlobDB,
+        cache: SessionCache | None = None,
+        notify_channel: str | None = None,
+        optimistic_locking: bool = False,
+        telemetry: bool | RepositoryTelemetry = False,
+        query_stats: bool | Callable[[QueryStats], None] = False,
+        slow_operation_threshold: float | None = None,
+        explain_sample_rate: float = 0.0,
         **kwargs,
     ):
         """
@@ -80,11 +249,68 @@ class PostgresSessionManager(RepositorySessionManager, SessionRepository):
             agent_model: SQLModel class for agents (default: AgentDB)
             message_model: SQLModel class for messages (default: MessageDB)
             logger: Custom logger instance (default: creates new logger)
+            buffer_messages: Buffer created messages and write them with a single
+                multi-row INSERT at the end of each agent invocation (default: False)
+            buffer_max_size: Flush automatically once this many messages are
+                buffered (default: 50)
+            buffer_max_age: Flush automatically once the oldest buffered message
+                is older than this many seconds, checked whenever a message is
+                buffered (default: None = no age limit)
+            restore_window: When restoring an agent, only load its most recent
+                N messages instead of the full history. Ignored for agents whose
+                conversation manager restores a removed_message_count, since
+                that count is an offset from the start of the full history
+                (default: None = all)
+            compression: Store messages whose serialized JSON reaches
+                compression_threshold bytes compressed with this codec
+                ("zstd"); requires the payload columns, see
+                add_message_payload_columns (default: None = no compression)
+            compression_threshold: Size in bytes from which messages are
+                compressed (default: 8192)
+            compression_level: Compression level (default: 3)
+            blob_threshold: Store bytes values of at least this many bytes in
+                message content blocks once in the blobs table, keeping only
+                a reference in the message (default: None = inline base64)
+            blob_model: SQLModel class for blobs (default: BlobDB)
+            message_blob_model: SQLModel class for message blob references
+                (default: MessageBlobDB)
+            cache: Cache for sessions and agents, e.g. shared_session_cache();
+                cached entries are validated against updated_at before use
+                (default: None = no caching)
+            notify_channel: Announce agent, session and message writes on
+                this PostgreSQL NOTIFY channel so CacheInvalidationListener
+                instances on other nodes evict them (default: None = no
+                notifications)
+            optimistic_locking: Make update_agent a compare-and-set on the
+                agents.version column, raising AgentVersionConflictError if
+                the agent was updated since this manager read it; requires the
+                version column, see add_agent_version_column (default: False)
+            telemetry: Trace repository operations and record their duration and
+                payload size with OpenTelemetry; True uses the global providers,
+                or pass a RepositoryTelemetry (default: False)
+            query_stats: Count the statements, round trips, rows and bytes of
+                every agent invocation into a QueryStats, available as
+                last_query_stats afterwards; pass a callable to also receive
+                each invocation's stats (default: False)
+            slow_operation_threshold: Log a warning with the SQL, parameter
+                shapes and durations of every repository operation taking at
+                least this many seconds (default: None = no slow log)
+            explain_sample_rate: Fraction of slow operations whose slowest
+                SELECT is run again under EXPLAIN (ANALYZE, BUFFERS) to log its
+                plan (default: 0.0 = never)
             **kwargs: Additional arguments for future extensibility
 
+        Raises:
+            ValueError: If the compression codec is not supported, or the
+                slow operation threshold or explain sample rate is invalid
+            ImportError: If the compression codec's library, or the
+                OpenTelemetry API for telemetry, is not installed
+
         Note:
             The engine must be a synchronous SQLAlchemy engine, not async.
             Tables must be created before using the session manager.
+            When buffer_messages is enabled, call close() (or flush()) before
+            discarding the manager outside of an agent invocation.
         """
         # Store engine and models
         self.engine = engine
@@ -93,13 +319,694 @@ class PostgresSessionManager(RepositorySessionManager, SessionRepository):
         self.MessageModel = message_model
         self.logger = logger or logging.getLogger(__name__)
 
+        # Message write buffer (only used when buffer_messages is enabled)
+        self.buffer_messages = buffer_messages
+        self.buffer_max_size = buffer_max_size
+        self.buffer_max_age = buffer_max_age
+        self._message_buffer: list[dict[str, Any]] = []
+        self._buffered_blobs: dict[str, bytes] = {}
+        self._buffered_blob_links: list[dict[str, Any]] = []
+        self._buffer_started_at: float | None = None
+        self._buffer_lock = threading.RLock()
+        self.rejected_messages: list[dict[str, Any]] = []
+
+        # Database session shared by repository calls inside unit_of_work()
+        self._active_unit_of_work: ContextVar[Session | None] = ContextVar(
+            f"postgres_unit_of_work_{id(self)}", default=None
+        )
+        self._unit_of_work_lock = threading.RLock()
+        # In-memory updates that must wait for the unit of work to commit, or be
+        # undone if it rolls back (None outside of a unit of work)
+        self._after_commit_callbacks: ContextVar[list[Callable[[], None]] | None] = ContextVar(
+            f"postgres_after_commit_{id(self)}", default=None
+        )
+        self._rollback_callbacks: ContextVar[list[Callable[[], None]] | None] = ContextVar(
+            f"postgres_rollback_{id(self)}", default=None
+        )
+
+        # Tail window used while restoring agents
+        self.restore_window = restore_window
+        self._restoring = False
+
+        # Compression of large messages (payload columns are only used when enabled)
+        self.compressor = (
+            MessageCompressor(compression, compression_threshold, compression_level)
+            if compression
+            else None
+        )
+
+        # Content-addressed storage of binary content blocks
+        self.blob_threshold = blob_threshold
+        self.BlobModel = blob_model
+        self.MessageBlobModel = message_blob_model
+
+        # Session/agent cache; keys are namespaced by database and tables
+        self.cache = cache
+        self._cache_namespace = (
+            str(engine.url),
+            self.SessionModel.__tablename__,
+            self.AgentModel.__tablename__,
+        )
+        self.notify_channel = notify_channel
+
+        # Agent versions last read or written, by (session_id, agent_id)
+        self.optimistic_locking = optimistic_locking
+        self._agent_versions: dict[tuple[str, str], int] = {}
+
+        # OpenTelemetry spans and metrics per repository operation
+        self.telemetry = default_telemetry() if telemetry is True else telemetry or None
+
+        # Queries counted per agent invocation; query_stats is only set while counting
+        self.count_invocation_queries = bool(query_stats)
+        self._query_stats_callback = query_stats if callable(query_stats) else None
+        self.query_stats: QueryStats | None = None
+        self.last_query_stats: QueryStats | None = None
+
+        # Slow operation log; statements are captured through the query counter listeners
+        self.slow_log = (
+            SlowOperationLog(slow_operation_threshold, explain_sample_rate, logger=self.logger)
+            if slow_operation_threshold is not None
+            else None
+        )
+        if self.count_invocation_queries or self.slow_log is not None:
+            install_query_counter(engine)
+
         # Initialize parent RepositorySessionManager
         super().__init__(session_id=session_id, session_repository=self)
 
         self.logger.debug(f"PostgresSessionManager initialized for session: {session_id}")
 
+    def register_hooks(self, registry: HookRegistry, **kwargs) -> None:
+        """
+        Register agent lifecycle hooks.
+
+        In addition to the RepositorySessionManager hooks, flushes buffered
+        messages at the end of every agent invocation when buffering is enabled,
+        and counts the queries of every invocation when query_stats is enabled.
+
+        Args:
+            registry: Strands hook registry of the agent
+            **kwargs: Additional arguments for future extensibility
+        """
+        if self.count_invocation_queries:
+            registry.add_callback(BeforeInvocationEvent, lambda event: self._start_query_stats())
+            # After-invocation callbacks run in reverse order: registered first, this one
+            # runs last and includes the final agent sync and buffer flush
+            registry.add_callback(AfterInvocationEvent, lambda event: self._finish_query_stats())
+
+        super().register_hooks(registry, **kwargs)
+
+        if self.buffer_messages:
+            registry.add_callback(AfterInvocationEvent, self._flush_after_invocation)
+
+    def _flush_after_invocation(self, event: AfterInvocationEvent) -> None:
+        """Write the messages buffered during an agent invocation."""
+        self.flush()
+
+    def initialize(self, agent: LocalAgent, **kwargs) -> None:
+        """
+        Initialize an agent with the session, restoring it if it exists.
+
+        When restore_window is set, only the most recent restore_window
+        messages are loaded into the agent, unless its conversation manager
+        restores a removed_message_count: sliding window and summarizing
+        managers count removed messages from the start of the full history,
+        so a truncated list would make them drop messages twice or duplicate
+        summaries.
+
+        Args:
+            agent: Agent to initialize
+            **kwargs: Additional arguments for future extensibility
+        """
+        self._restoring = True
+        try:
+            super().initialize(agent, **kwargs)
+        finally:
+            self._restoring = False
+
+    # ==================== Lease Methods ====================
+
+    def acquire_lease(self, timeout: float | None = None) -> SessionLease:
+        """
+        Acquire the exclusive lease on this session, waiting if another worker holds it.
+
+        Args:
+            timeout: Maximum seconds to wait (default: None = wait forever)
+
+        Returns:
+            The held SessionLease; release it with release() or use it as a
+            context manager
+
+        Raises:
+            SessionLeaseUnavailableError: If timeout expired first
+            Exception: If database operation fails
+        """
+        return SessionLease(self.engine, self.session_id, logger=self.logger).acquire(timeout)
+
+    def try_acquire_lease(self) -> SessionLease | None:
+        """
+        Acquire the exclusive lease on this session if no other worker holds it.
+
+        Returns:
+            The held SessionLease, or None if another worker holds it
+
+        Raises:
+            Exception: If database operation fails
+        """
+        lease = SessionLease(self.engine, self.session_id, logger=self.logger)
+        return lease if lease.try_acquire() else None
+
+    # ==================== Query Stats Methods ====================
+
+    @contextmanager
+    def count_queries(self) -> Iterator[QueryStats]:
+        """
+        Count the queries issued by this manager's repository methods in the block.
+
+        Works whether or not query_stats is enabled; inside an agent invocation
+        with query_stats enabled, the invocation's stats are not counted into
+        meanwhile.
+
+        Yields:
+            QueryStats filled in as the block runs
+
+        Example:
+            >>> with session_manager.count_queries() as stats:
+            ...     agent = Agent(session_manager=session_manager)
+            >>> stats.round_trips
+        """
+        install_query_counter(self.engine)
+        previous = self.query_stats
+        self.query_stats = QueryStats()
+        try:
+            yield self.query_stats
+        finally:
+            self.query_stats = previous
+
+    def _start_query_stats(self) -> None:
+        """Start counting the queries of an agent invocation."""
+        self.query_stats = QueryStats()
+
+    def _finish_query_stats(self) -> None:
+        """Stop counting the queries of an agent invocation and report them."""
+        stats = self.query_stats
+        if stats is None:
+            return
+        self.query_stats = None
+        self.last_query_stats = stats
+
+        self.logger.debug(
+            f"Invocation of session {self.session_id}: {stats.statements} statements, "
+            f"{stats.round_trips} round trips, {stats.rows} rows, {stats.bytes_sent} bytes sent"
+        )
+        if self._query_stats_callback is not None:
+            self._query_stats_callback(stats)
+
+    # ==================== Unit of Work ====================
+
+    @contextmanager
+    def unit_of_work(self) -> Iterator[Session]:
+        """
+        Run all repository calls in one database transaction.
+
+        Inside the block every repository method reuses the same database
+        session, and therefore one pooled connection and one transaction,
+        instead of checking out a connection and committing per call. The
+        transaction commits once when the block exits, including any buffered
+        messages, and rolls back entirely if the block raises. Nested calls
+        join the outer unit of work. Cache entries for its writes are only
+        stored once it has committed.
+
+        Yields:
+            The database session shared by the unit of work
+
+        Raises:
+            Exception: If database operation fails
+
+        Example:
+            >>> with session_manager.unit_of_work():
+            ...     agent("Summarize my open tickets")
+        """
+        active_session = self._active_unit_of_work.get()
+        if active_session is not None:
+            yield active_session
+            return
+
+        after_commit: list[Callable[[], None]] = []
+        rollback: list[Callable[[], None]] = []
+        with Session(self.engine) as db_session:
+            token = self._active_unit_of_work.set(db_session)
+            after_commit_token = self._after_commit_callbacks.set(after_commit)
+            rollback_token = self._rollback_callbacks.set(rollback)
+            try:
+                yield db_session
+                # Buffered messages belong to the same transaction
+                with counting(self.query_stats):
+                    self.flush()
+                    db_session.commit()
+            except BaseException:
+                with counting(self.query_stats):
+                    db_session.rollback()
+                for callback in reversed(rollback):
+                    callback()
+                raise
+            finally:
+                self._rollback_callbacks.reset(rollback_token)
+                self._after_commit_callbacks.reset(after_commit_token)
+                self._active_unit_of_work.reset(token)
+
+        for callback in after_commit:
+            callback()
+
+    @contextmanager
+    def _db_session(self) -> Iterator[Session]:
+        """Yield the unit of work session if one is active, else a new session."""
+        active_session = self._active_unit_of_work.get()
+        if active_session is None:
+            with Session(self.engine) as db_session:
+                yield db_session
+            return
+
+        # Sessions are not thread-safe; serialize tool threads sharing the unit of work
+        with self._unit_of_work_lock:
+            yield active_session
+
+    def _commit(self, db_session: Session) -> None:
+        """Commit, or only flush when the session belongs to a unit of work."""
+        if db_session is self._active_unit_of_work.get():
+            db_session.flush()
+        else:
+            db_session.commit()
+
+    def _after_commit(self, callback: Callable[[], None]) -> None:
+        """Run callback now, or once the active unit of work has committed."""
+        callbacks = self._after_commit_callbacks.get()
+        if callbacks is None:
+            callback()
+        else:
+            callbacks.append(callback)
+
+    def _set_agent_version(self, key: tuple[str, str], version: int | None) -> None:
+        """Track (or forget, with None) an agent version, undone if the unit of work rolls back."""
+        rollback = self._rollback_callbacks.get()
+        if rollback is not None:
+            previous = self._agent_versions.get(key)
+
+            def restore() -> None:
+                if previous is None:
+                    self._agent_versions.pop(key, None)
+                else:
+                    self._agent_versions[key] = previous
+
+            rollback.append(restore)
+
+        if version is None:
+            self._agent_versions.pop(key, None)
+        else:
+            self._agent_versions[key] = version
+
+    # ==================== Buffer Methods ====================
+
+    def flush(self) -> int:
+        """
+        Write all buffered messages in a single transaction.
+
+        Rows are sent as one multi-row INSERT. If the write fails, the rows
+        stay buffered so a later flush() can retry them, unless the database
+        rejected them (integrity or data error): the rows are then written one
+        by one, those rejected again are moved to rejected_messages, and the
+        error is raised.
+
+        Returns:
+            Number of messages written
+
+        Raises:
+            Exception: If database operation fails
+        """
+        with self._buffer_lock:
+            if not self._message_buffer:
+                return 0
+            return self._write_buffer()
+
+    @_operation("flush")
+    def _write_buffer(self) -> int:
+        """Write the (non-empty) message buffer; called with the buffer lock held."""
+        rows = self._message_buffer
+        try:
+            self._write_rows(rows, self._buffered_blobs, self._buffered_blob_links)
+        except _REJECTED_ROW_ERRORS as e:
+            self.logger.error(f"Error flushing messages, rejected by the database: {e}")
+            self._write_rejected_buffer()
+            raise
+        except Exception as e:
+            self.logger.error(f"Error flushing messages: {e}")
+            raise
+
+        self._clear_buffer()
+
+        self.logger.debug(f"Flushed {len(rows)} buffered messages")
+        return len(rows)
+
+    def _write_rows(
+        self, rows: list[dict[str, Any]], blobs: dict[str, bytes], links: list[dict[str, Any]]
+    ) -> None:
+        """Insert message rows with their blobs in one transaction."""
+        with self._db_session() as db_session:
+            self._insert_blobs(db_session, blobs)
+            db_session.exec(insert_message_statement(self.MessageModel), params=rows)
+            self._insert_blob_links(db_session, links)
+            self._notify(
+                db_session,
+                [("message", row["session_id"], row["agent_id"]) for row in rows],
+            )
+            self._commit(db_session)
+
+    def _write_rejected_buffer(self) -> None:
+        """
+        Take the rows of a rejected flush out of the buffer.
+
+        Each row is written again in its own transaction, so one bad row does
+        not hold back the others; rows rejected again are moved to
+        rejected_messages. Inside a unit of work the transaction is aborted,
+        so all rows are moved. Called with the buffer lock held.
+        """
+        rows = self._message_buffer
+        blobs = self._buffered_blobs
+        links = self._buffered_blob_links
+        self._clear_buffer()
+
+        if self._active_unit_of_work.get() is not None:
+            self.rejected_messages.extend(rows)
+            self.logger.error(f"{len(rows)} buffered messages moved to rejected_messages")
+            return
+
+        for index, row in enumerate(rows):
+            key = (row["session_id"], row["agent_id"], row["message_id"])
+            row_links = [
+                link
+                for link in links
+                if (link["session_id"], link["agent_id"], link["message_id"]) == key
+            ]
+            row_blobs = {link["blob_hash"]: blobs[link["blob_hash"]] for link in row_links}
+            try:
+                self._write_rows([row], row_blobs, row_links)
+            except _REJECTED_ROW_ERRORS as e:
+                self.rejected_messages.append(row)
+                self.logger.error(f"Message {row['message_id']} moved to rejected_messages: {e}")
+            except Exception:
+                # Not caused by the rows: keep the remaining ones for a retry
+                self._message_buffer = rows[index:]
+                self._buffered_blobs = blobs
+                self._buffered_blob_links = links
+                self._buffer_started_at = time.monotonic()
+                raise
+
+    def _clear_buffer(self) -> None:
+        """Empty the message buffer."""
+        self._message_buffer = []
+        self._buffered_blobs = {}
+        self._buffered_blob_links = []
+        self._buffer_started_at = None
+
+    def close(self) -> None:
+        """
+        Flush any buffered messages.
+
+        Raises:
+            Exception: If database operation fails
+        """
+        self.flush()
+
+    def _buffer_message(self, values: dict[str, Any], blobs: dict[str, bytes]) -> None:
+        """Add a message row to the buffer, flushing if a threshold is reached."""
+        with self._buffer_lock:
+            started_at = self._buffer_started_at
+            if not self._message_buffer or started_at is None:
+                started_at = self._buffer_started_at = time.monotonic()
+            self._message_buffer.append(values)
+            self._buffer_blobs(values, blobs)
+
+            buffer_age = time.monotonic() - started_at
+            if len(self._message_buffer) >= self.buffer_max_size or (
+                self.buffer_max_age is not None and buffer_age >= self.buffer_max_age
+            ):
+                self.flush()
+
+    def _discard_buffered_sessions(self, session_ids: set[str]) -> None:
+        """Drop buffered messages of sessions being deleted; they can never be written."""
+        self._discard_buffered(lambda row: row["session_id"] in session_ids)
+
+    def _discard_buffered(self, predicate: Callable[[dict[str, Any]], bool]) -> None:
+        """Drop the buffered messages, and their blob links, matching predicate."""
+        with self._buffer_lock:
+            self._message_buffer = [
+                values for values in self._message_buffer if not predicate(values)
+            ]
+            self._buffered_blob_links = [
+                link for link in self._buffered_blob_links if not predicate(link)
+            ]
+            if not self._message_buffer:
+                self._buffer_started_at = None
+
+    def _find_buffered_message(
+        self, session_id: str, agent_id: str, message_id: int
+    ) -> dict[str, Any] | None:
+        """Return the buffered row for a message, if it has not been flushed yet."""
+        for values in self._message_buffer:
+            if (
+                values["message_id"] == message_id
+                and values["session_id"] == session_id
+                and values["agent_id"] == agent_id
+            ):
+                return values
+        return None
+
+    def _buffer_blobs(self, values: dict[str, Any], blobs: dict[str, bytes]) -> None:
+        """Keep the blobs of a buffered message row until the next flush."""
+        self._buffered_blobs.update(blobs)
+        self._buffered_blob_links.extend(
+            self._blob_links(values["session_id"], values["agent_id"], values["message_id"], blobs)
+        )
+
+    def _has_payload_columns(self) -> bool:
+        """Whether the messages table has the compressed payload columns."""
+        return self.compressor is not None or has_message_payload_columns(
+            self.engine, self.MessageModel
+        )
+
+    def _message_values(
+        self,
+        session_id: str,
+        agent_id: str,
+        session_message: SessionMessage,
+        blobs: dict[str, bytes] | None = None,
+    ) -> dict[str, Any]:
+        """
+        Build the messages table row for a Strands SessionMessage.
+
+        When blob_threshold is set, large bytes values are replaced by blob
+        references and their contents are added to blobs.
+        """
+        if self.blob_threshold is not None and blobs is not None:
+            redact_message = session_message.redact_message
+            session_message = replace(
+                session_message,
+                message=offload_blobs(session_message.message, self.blob_threshold, blobs),
+                redact_message=(
+                    None
+                    if redact_message is None
+                    else offload_blobs(redact_message, self.blob_threshold, blobs)
+                ),
+            )
+
+        message_data = session_message.to_dict()
+
+        values = {
+            "message_id": message_data.get("message_id"),
+            "session_id": session_id,
+            "agent_id": agent_id,
+            "message": message_data.get("message"),
+            "redact_message": message_data.get("redact_message"),
+            "created_at": message_data.get("created_at"),
+            "updated_at": message_data.get("updated_at"),
+        }
+
+        if self.compressor is not None:
+            self.compressor.compress_values(values)
+        return values
+
+    # ==================== Blob Methods ====================
+
+    def _blob_links(
+        self, session_id: str, agent_id: str, message_id: int, blobs: dict[str, bytes]
+    ) -> list[dict[str, Any]]:
+        """Build the message_blobs rows linking a message to its blobs."""
+        return [
+            {
+                "session_id": session_id,
+                "agent_id": agent_id,
+                "message_id": message_id,
+                "blob_hash": blob_hash,
+            }
+            for blob_hash in blobs
+        ]
+
+    def _insert_blobs(self, db_session: Session, blobs: dict[str, bytes]) -> None:
+        """Store blobs that are not stored yet."""
+        if not blobs:
+            return
+
+        statement = pg_insert(self.BlobModel).on_conflict_do_nothing(index_elements=["blob_hash"])
+        db_session.exec(
+            statement,
+            params=[
+                {
+                    "blob_hash": blob_hash,
+                    "data": data,
+                    "size": len(data),
+                    "created_at": datetime.now(timezone.utc),
+                }
+                for blob_hash, data in blobs.items()
+            ],
+        )
+
+    def _insert_blob_links(self, db_session: Session, links: list[dict[str, Any]]) -> None:
+        """Record message to blob references (after the messages are written)."""
+        if not links:
+            return
+
+        statement = pg_insert(self.MessageBlobModel).on_conflict_do_nothing()
+        db_session.exec(statement, params=links)
+
+    def _resolve_blobs(self, db_session: Session, blob_refs: list[BlobRef]) -> None:
+        """Replace blob references collected while reading messages by their contents."""
+        if not blob_refs:
+            return
+
+        statement = select(self.BlobModel.blob_hash, self.BlobModel.data).where(
+            col(self.BlobModel.blob_hash).in_({blob_hash for _, _, blob_hash in blob_refs})
+        )
+        blobs = {blob_hash: bytes(data) for blob_hash, data in db_session.exec(statement).all()}
+
+        missing = resolve_blob_refs(blob_refs, blobs)
+        if missing:
+            self.logger.warning(f"Blobs referenced by messages not found: {sorted(missing)}")
+
+    # ==================== Cache Methods ====================
+
+    def _session_cache_key(self, session_id: str) -> tuple[Any, ...]:
+        """Cache key of a session."""
+        return (self._cache_namespace, "session", session_id)
+
+    def _agent_cache_key(self, session_id: str, agent_id: str) -> tuple[Any, ...]:
+        """Cache key of an agent."""
+        return (self._cache_namespace, "agent", session_id, agent_id)
+
+    def _cache_generation(self) -> int | None:
+        """Cache generation to pass to _cache_put for a value about to be read or written."""
+        return self.cache.generation if self.cache is not None else None
+
+    def _cache_put(
+        self, key: tuple[Any, ...], updated_at: Any, value: Any, generation: int | None
+    ) -> None:
+        """
+        Cache an object with its updated_at as version.
+
+        Inside a unit of work the entry is stored once it commits, since the
+        object may only exist in its transaction.
+        """
+        cache = self.cache
+        if cache is None:
+            return
+
+        version = timestamp_version(updated_at)
+        if self._after_commit_callbacks.get() is not None:
+            # The caller may change the object before the commit
+            value = copy.deepcopy(value)
+        self._after_commit(lambda: cache.put(key, version, value, generation))
+
+    def _cache_invalidate_matching(self, predicate: Callable[[Any], bool]) -> None:
+        """Drop cached entries whose key matches, again once the unit of work commits."""
+        cache = self.cache
+        if cache is None:
+            return
+
+        cache.invalidate_matching(predicate)
+        callbacks = self._after_commit_callbacks.get()
+        if callbacks is not None:
+            # Other threads may cache the rows again until the deletion commits
+            callbacks.append(lambda: cache.invalidate_matching(predicate))
+
+    def _cache_invalidate_sessions(self, session_ids: set[str]) -> None:
+        """Drop cached sessions and their agents."""
+        namespace = self._cache_namespace
+        self._cache_invalidate_matching(lambda key: key[0] == namespace and key[2] in session_ids)
+
+    def _read_cached(
+        self, db_session: Session, key: tuple[Any, ...], version_statement: Any, params: dict
+    ) -> tuple[Any, Any] | None:
+        """
+        Return the cached (version, object) for key if it is still current.
+
+        Runs version_statement, which reads only the version column of the
+        row, and compares the result with the cached version; stale entries
+        are dropped. The check is skipped while a CacheInvalidationListener
+        keeps the cache synchronized. Entries versioned the other way (see
+        optimistic_locking) are ignored and replaced by the next put.
+        """
+        if self.cache is None:
+            return None
+
+        entry = self.cache.get(key)
+        if entry is None:
+            return None
+
+        # Managers with and without optimistic locking may share the cache: agents they
+        # cache are versioned by the integer version and by updated_at respectively
+        if isinstance(entry[0], int) != (self.optimistic_locking and key[1] == "agent"):
+            return None
+
+        if self.cache.synchronized:
+            return entry
+
+        current = db_session.exec(version_statement, params=params).one_or_none()
+        if current is not None and timestamp_version(current) == entry[0]:
+            return entry
+
+        self.cache.invalidate(key)
+        return None
+
+    # ==================== Notification Methods ====================
+
+    def _notify(
+        self, db_session: Session, events: Iterable[tuple[str, str | None, str | None]]
+    ) -> None:
+        """
+        Announce writes on notify_channel with one statement.
+
+        Notifications are delivered when the transaction commits, and not at
+        all if it rolls back.
+
+        Args:
+            db_session: Database session of the write
+            events: (kind, session_id, agent_id) of each write
+        """
+        if self.notify_channel is None:
+            return
+
+        origin = self.cache.origin if self.cache is not None else None
+        payloads = list(
+            dict.fromkeys(cache_event_payload(*event, origin=origin) for event in events)
+        )
+        if payloads:
+            db_session.exec(
+                _NOTIFY_STATEMENT,
+                params={"channel": self.notify_channel, "payloads": payloads},
+            )
+
     # ==================== Session Methods ====================
 
+    @_operation("create_session")
     def create_session(self, session: StrandsSession, **kwargs) -> StrandsSession:
         """
         Create a new session in the database.
@@ -107,6 +1014,9 @@ class PostgresSessionManager(RepositorySessionManager, SessionRepository):
         Only creates if the session doesn't exist. If it already exists,
         returns the existing session without modification.
 
+        Uses a single INSERT ... ON CONFLICT (session_id) DO NOTHING statement,
+        so concurrent first requests for the same session cannot race.
+
         Args:
             session: Strands Session object to create
             **kwargs: Additional arguments for future extensibility
@@ -118,44 +1028,50 @@ class PostgresSessionManager(RepositorySessionManager, SessionRepository):
             Exception: If database operation fails
         """
         try:
-            with Session(self.engine) as db_session:
-                # Check if session already exists
-                existing_session = db_session.get(self.SessionModel, session.session_id)
-
-                if existing_session:
-                    self.logger.debug(
-                        f"Session {session.session_id} already exists, skipping creation"
-                    )
-                    return session
+            generation = self._cache_generation()
 
+            with self._db_session() as db_session:
                 # Get session data from Strands SDK
                 session_data = session.to_dict()
 
                 # Extract session_type (may be an Enum, need string value)
-                session_type_value = session_data.get("session_type")
+                session_type_value: Any = session_data.get("session_type")
                 if hasattr(session_type_value, "value"):
                     session_type_value = session_type_value.value
 
-                # Create SQLModel instance
-                session_db = self.SessionModel(
-                    session_id=session_data.get("session_id"),
-                    session_type=session_type_value,
-                    created_at=session_data.get("created_at"),
-                    updated_at=session_data.get("updated_at"),
-                )
-
-                # Insert into database
-                db_session.add(session_db)
-                db_session.commit()
+                # Insert unless the session already exists
+                created_id = db_session.exec(
+                    insert_session_statement(self.SessionModel),
+                    params={
+                        "session_id": session_data.get("session_id"),
+                        "session_type": session_type_value,
+                        "created_at": session_data.get("created_at") or datetime.now(timezone.utc),
+                        "updated_at": session_data.get("updated_at") or datetime.now(timezone.utc),
+                    },
+                ).scalar_one_or_none()
+                self._commit(db_session)
+
+                if created_id is None:
+                    self.logger.debug(
+                        f"Session {session.session_id} already exists, skipping creation"
+                    )
+                else:
+                    self._cache_put(
+                        self._session_cache_key(session.session_id),
+                        session_data.get("updated_at"),
+                        session,
+                        generation,
+                    )
+                    self.logger.info(f"Session created: {session.session_id}")
 
-                self.logger.info(f"Session created: {session.session_id}")
                 return session
 
         except Exception as e:
             self.logger.error(f"Error creating session: {e}")
             raise
 
-    def read_session(self, session_id: str, **kwargs) -> Optional[StrandsSession]:
+    @_operation("read_session")
+    def read_session(self, session_id: str, **kwargs) -> StrandsSession | None:
         """
         Read a session from the database.
 
@@ -170,11 +1086,21 @@ class PostgresSessionManager(RepositorySessionManager, SessionRepository):
             Exception: If database operation fails
         """
         try:
-            with Session(self.engine) as db_session:
-                statement = select(self.SessionModel).where(
-                    self.SessionModel.session_id == session_id
+            generation = self._cache_generation()
+
+            with self._db_session() as db_session:
+                cache_key = self._session_cache_key(session_id)
+                params = {"session_id": session_id}
+                cached = self._read_cached(
+                    db_session,
+                    cache_key,
+                    select_session_statement(self.SessionModel, "updated_at"),
+                    params,
                 )
-                result = db_session.exec(statement)
+                if cached is not None:
+                    return cast(StrandsSession, cached[1])
+
+                result = db_session.exec(select_session_statement(self.SessionModel), params=params)
                 session_db = result.one_or_none()
 
                 if session_db:
@@ -186,13 +1112,16 @@ class PostgresSessionManager(RepositorySessionManager, SessionRepository):
                     ):
                         session_data["session_type"] = SessionType(session_data["session_type"])
 
-                    return StrandsSession.from_dict(session_data)
+                    session = StrandsSession.from_dict(session_data)
+                    self._cache_put(cache_key, session_db.updated_at, session, generation)
+                    return session
                 return None
 
         except Exception as e:
             self.logger.error(f"Error reading session: {e}")
             raise
 
+    @_operation("update_session")
     def update_session(self, session: StrandsSession) -> StrandsSession:
         """
         Update an existing session in the database.
@@ -207,7 +1136,7 @@ class PostgresSessionManager(RepositorySessionManager, SessionRepository):
             Exception: If database operation fails
         """
         try:
-            with Session(self.engine) as db_session:
+            with self._db_session() as db_session:
                 statement = select(self.SessionModel).where(
                     self.SessionModel.session_id == session.session_id
                 )
@@ -218,7 +1147,7 @@ class PostgresSessionManager(RepositorySessionManager, SessionRepository):
                     # Session has minimal mutable fields
                     # updated_at is handled automatically by database
                     db_session.add(session_db)
-                    db_session.commit()
+                    self._commit(db_session)
                     db_session.refresh(session_db)
 
                     self.logger.info(f"Session updated: {session.session_id}")
@@ -231,12 +1160,15 @@ class PostgresSessionManager(RepositorySessionManager, SessionRepository):
             self.logger.error(f"Error updating session: {e}")
             raise
 
+    @_operation("delete_session")
     def delete_session(self, session_id: str) -> bool:
         """
         Delete a session and all related data (CASCADE).
 
         This will automatically delete all associated agents and messages
-        due to ON DELETE CASCADE foreign key constraints.
+        due to ON DELETE CASCADE foreign key constraints. The session row is
+        removed with a single DELETE ... RETURNING statement, without loading
+        it first.
 
         Args:
             session_id: ID of the session to delete
@@ -248,16 +1180,22 @@ class PostgresSessionManager(RepositorySessionManager, SessionRepository):
             Exception: If database operation fails
         """
         try:
-            with Session(self.engine) as db_session:
-                statement = select(self.SessionModel).where(
-                    self.SessionModel.session_id == session_id
+            self._discard_buffered_sessions({session_id})
+            self._cache_invalidate_sessions({session_id})
+
+            with self._db_session() as db_session:
+                statement = (
+                    delete(self.SessionModel)
+                    .where(col(self.SessionModel.session_id) == session_id)
+                    .returning(col(self.SessionModel.session_id))
+                    .execution_options(synchronize_session=False)
                 )
-                result = db_session.exec(statement)
-                session_db = result.one_or_none()
+                deleted_id = db_session.exec(statement).scalar_one_or_none()
+                if deleted_id is not None:
+                    self._notify(db_session, [("session", session_id, None)])
+                self._commit(db_session)
 
-                if session_db:
-                    db_session.delete(session_db)
-                    db_session.commit()
+                if deleted_id is not None:
                     self.logger.info(f"Session deleted: {session_id}")
                     return True
 
@@ -268,8 +1206,65 @@ class PostgresSessionManager(RepositorySessionManager, SessionRepository):
             self.logger.error(f"Error deleting session: {e}")
             raise
 
+    @_operation("delete_sessions")
+    def delete_sessions(self, session_ids: Iterable[str], batch_size: int = 1000) -> int:
+        """
+        Delete many sessions and all related data (CASCADE).
+
+        Session ids are deleted in batches of at most batch_size, each batch
+        with one DELETE ... WHERE session_id IN (...) statement committed in
+        its own transaction, which keeps lock time and WAL per transaction
+        bounded for large purges.
+
+        Args:
+            session_ids: IDs of the sessions to delete
+            batch_size: Maximum number of sessions deleted per transaction
+
+        Returns:
+            Number of sessions deleted (ids that were not found are skipped)
+
+        Raises:
+            ValueError: If batch_size is not positive
+            Exception: If database operation fails
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be a positive integer")
+
+        # Drop duplicates, keeping the caller's order
+        unique_ids = list(dict.fromkeys(session_ids))
+        deleted = 0
+
+        try:
+            self._discard_buffered_sessions(set(unique_ids))
+            self._cache_invalidate_sessions(set(unique_ids))
+
+            for start in range(0, len(unique_ids), batch_size):
+                batch = unique_ids[start : start + batch_size]
+
+                with self._db_session() as db_session:
+                    statement = (
+                        delete(self.SessionModel)
+                        .where(col(self.SessionModel.session_id).in_(batch))
+                        .returning(col(self.SessionModel.session_id))
+                        .execution_options(synchronize_session=False)
+                    )
+                    deleted_ids = db_session.exec(statement).scalars().all()
+                    self._notify(
+                        db_session, [("session", deleted_id, None) for deleted_id in deleted_ids]
+                    )
+                    self._commit(db_session)
+                    deleted += len(deleted_ids)
+
+            self.logger.info(f"Sessions deleted: {deleted} of {len(unique_ids)}")
+            return deleted
+
+        except Exception as e:
+            self.logger.error(f"Error deleting sessions: {e}")
+            raise
+
     # ==================== Agent Methods ====================
 
+    @_operation("create_agent", write=True)
     def create_agent(self, session_id: str, session_agent: SessionAgent, **kwargs) -> None:
         """
         Create a new agent in the database.
@@ -283,11 +1278,13 @@ class PostgresSessionManager(RepositorySessionManager, SessionRepository):
             Exception: If database operation fails
         """
         try:
-            with Session(self.engine) as db_session:
+            generation = self._cache_generation()
+
+            with self._db_session() as db_session:
                 agent_data = session_agent.to_dict()
 
-                # Create SQLModel with JSONB fields
-                agent_db = self.AgentModel(
+                # Core INSERT: the version column is left to its default (1)
+                statement = insert(self.AgentModel).values(
                     agent_id=agent_data.get("agent_id"),
                     session_id=session_id,
                     state=agent_data.get("state", {}),
@@ -296,17 +1293,27 @@ class PostgresSessionManager(RepositorySessionManager, SessionRepository):
                     created_at=agent_data.get("created_at"),
                     updated_at=agent_data.get("updated_at"),
                 )
-
-                db_session.add(agent_db)
-                db_session.commit()
-
+                db_session.exec(statement)
+                self._commit(db_session)
+
+                version = agent_data.get("updated_at")
+                if self.optimistic_locking:
+                    version = 1
+                    self._set_agent_version((session_id, session_agent.agent_id), version)
+                self._cache_put(
+                    self._agent_cache_key(session_id, session_agent.agent_id),
+                    version,
+                    session_agent,
+                    generation,
+                )
                 self.logger.info(f"Agent created: {session_agent.agent_id}")
 
         except Exception as e:
             self.logger.error(f"Error creating agent: {e}")
             raise
 
-    def read_agent(self, session_id: str, agent_id: str, **kwargs) -> Optional[SessionAgent]:
+    @_operation("read_agent")
+    def read_agent(self, session_id: str, agent_id: str, **kwargs) -> SessionAgent | None:
         """
         Read an agent from the database.
 
@@ -322,71 +1329,131 @@ class PostgresSessionManager(RepositorySessionManager, SessionRepository):
             Exception: If database operation fails
         """
         try:
-            with Session(self.engine) as db_session:
-                statement = (
-                    select(self.AgentModel)
-                    .where(self.AgentModel.agent_id == agent_id)
-                    .where(self.AgentModel.session_id == session_id)
+            generation = self._cache_generation()
+
+            with self._db_session() as db_session:
+                cache_key = self._agent_cache_key(session_id, agent_id)
+                params = {"session_id": session_id, "agent_id": agent_id}
+                # With optimistic locking the version column versions cache entries
+                version_statement = select_agent_column_statement(
+                    self.AgentModel, "version" if self.optimistic_locking else "updated_at"
                 )
-                result = db_session.exec(statement)
-                agent_db = result.one_or_none()
-
-                if agent_db:
-                    agent_data = agent_db.model_dump()
-                    # Map internal_state → _internal_state for SDK
-                    agent_data["_internal_state"] = agent_data.pop("internal_state", {})
-
-                    return SessionAgent.from_dict(agent_data)
+                cached = self._read_cached(db_session, cache_key, version_statement, params)
+                if cached is not None:
+                    version, session_agent = cached
+                    if self.optimistic_locking:
+                        self._set_agent_version((session_id, agent_id), version)
+                    return cast(SessionAgent, session_agent)
+
+                statement = select_agent_statement(self.AgentModel, self.optimistic_locking)
+                result = db_session.exec(statement, params=params)
+                row = result.one_or_none()
+
+                if row:
+                    session_agent = _session_agent_from_row(row)
+                    version = row.updated_at
+                    if self.optimistic_locking:
+                        version = row.version
+                        self._set_agent_version((session_id, agent_id), version)
+                    self._cache_put(cache_key, version, session_agent, generation)
+                    return session_agent
                 return None
 
         except Exception as e:
             self.logger.error(f"Error reading agent: {e}")
             raise
 
-    def update_agent(self, session_id: str, session_agent: SessionAgent, **kwargs) -> None:
+    @_operation("update_agent")
+    def update_agent(  # type: ignore[override]
+        self, session_id: str, session_agent: SessionAgent, **kwargs
+    ) -> bool:
         """
         Update an existing agent in the database.
 
+        Issues a single UPDATE without reading the current row first; the
+        affected row count tells whether the agent exists.
+
+        With optimistic locking the UPDATE only applies if the agent still
+        has the version this manager last read or wrote, and increments it.
+        No row lock is held between reading and updating the agent.
+
         Args:
             session_id: ID of the parent session
             session_agent: Strands SessionAgent object with updated data
             **kwargs: Additional arguments for future extensibility
 
+        Returns:
+            True if the agent was updated, False if not found
+
         Raises:
+            AgentVersionConflictError: If optimistic locking is enabled and the
+                agent was updated by someone else since it was read
             Exception: If database operation fails
         """
         try:
-            with Session(self.engine) as db_session:
-                statement = (
-                    select(self.AgentModel)
-                    .where(self.AgentModel.agent_id == session_agent.agent_id)
-                    .where(self.AgentModel.session_id == session_id)
-                )
-                result = db_session.exec(statement)
-                agent_db = result.one_or_none()
+            generation = self._cache_generation()
+            version_key = (session_id, session_agent.agent_id)
+            cache_key = self._agent_cache_key(session_id, session_agent.agent_id)
 
-                if agent_db:
-                    agent_data = session_agent.to_dict()
+            with self._db_session() as db_session:
+                agent_data = session_agent.to_dict()
 
-                    # Update JSONB fields
-                    agent_db.state = agent_data.get("state", {})
-                    agent_db.conversation_manager_state = agent_data.get(
-                        "conversation_manager_state", {}
+                # Overwrite JSONB fields in place
+                params = {
+                    "b_session_id": session_id,
+                    "b_agent_id": session_agent.agent_id,
+                    "state": agent_data.get("state", {}),
+                    "conversation_manager_state": agent_data.get("conversation_manager_state", {}),
+                    "internal_state": agent_data.get("_internal_state", {}),
+                    "updated_at": agent_data.get("updated_at"),
+                }
+
+                version = agent_data.get("updated_at")
+                if self.optimistic_locking:
+                    expected_version = self._agent_versions.get(version_key)
+                    params["expected_version"] = expected_version
+                    statement = update_agent_statement(
+                        self.AgentModel, versioned=True, expect_version=expected_version is not None
                     )
-                    agent_db.internal_state = agent_data.get("_internal_state", {})
-                    agent_db.updated_at = agent_data.get("updated_at")
-
-                    db_session.add(agent_db)
-                    db_session.commit()
-
+                    version = db_session.exec(statement, params=params).scalar_one_or_none()
+                    updated = version is not None
+                else:
+                    statement = update_agent_statement(self.AgentModel)
+                    updated = bool(db_session.exec(statement, params=params).rowcount)
+
+                if updated:
+                    self._notify(db_session, [("agent", session_id, session_agent.agent_id)])
+                    self._commit(db_session)
+                elif self.optimistic_locking and expected_version is not None:
+                    actual_version = db_session.exec(
+                        select_agent_column_statement(self.AgentModel, "version"),
+                        params={"session_id": session_id, "agent_id": session_agent.agent_id},
+                    ).one_or_none()
+                    if actual_version is not None:
+                        # The stale version is kept, so every update conflicts until the
+                        # agent is read again
+                        if self.cache is not None:
+                            self.cache.invalidate(cache_key)
+                        raise AgentVersionConflictError(
+                            session_id, session_agent.agent_id, expected_version, actual_version
+                        )
+
+                if updated:
+                    if self.optimistic_locking:
+                        self._set_agent_version(version_key, version)
+                    self._cache_put(cache_key, version, session_agent, generation)
                     self.logger.info(f"Agent updated: {agent_data.get('agent_id')}")
                 else:
+                    if self.cache is not None:
+                        self.cache.invalidate(cache_key)
                     self.logger.warning(f"Agent {session_agent.agent_id} not found for update")
+                return updated
 
         except Exception as e:
             self.logger.error(f"Error updating agent: {e}")
             raise
 
+    @_operation("delete_agent")
     def delete_agent(self, agent_id: str) -> bool:
         """
         Delete an agent from the database.
@@ -401,14 +1468,33 @@ class PostgresSessionManager(RepositorySessionManager, SessionRepository):
             Exception: If database operation fails
         """
         try:
-            with Session(self.engine) as db_session:
-                statement = select(self.AgentModel).where(self.AgentModel.agent_id == agent_id)
-                result = db_session.exec(statement)
-                agent_db = result.one_or_none()
+            with self._db_session() as db_session:
+                # Only key columns are read, so optional columns need not exist
+                statement = select(self.AgentModel.session_id).where(
+                    self.AgentModel.agent_id == agent_id
+                )
+                session_id = db_session.exec(statement).one_or_none()
+
+                if session_id is not None:
+                    db_session.exec(
+                        delete(self.AgentModel)
+                        .where(col(self.AgentModel.agent_id) == agent_id)
+                        .where(col(self.AgentModel.session_id) == session_id)
+                        .execution_options(synchronize_session=False)
+                    )
+                    self._notify(db_session, [("agent", None, agent_id)])
+                    self._commit(db_session)
 
-                if agent_db:
-                    db_session.delete(agent_db)
-                    db_session.commit()
+                    # Their agent is gone: they could never be written
+                    self._discard_buffered(
+                        lambda row: row["session_id"] == session_id and row["agent_id"] == agent_id
+                    )
+                    self._set_agent_version((session_id, agent_id), None)
+
+                    namespace = self._cache_namespace
+                    self._cache_invalidate_matching(
+                        lambda key: key[0] == namespace and key[1] == "agent" and key[3] == agent_id
+                    )
                     self.logger.info(f"Agent deleted: {agent_id}")
                     return True
 
@@ -418,7 +1504,8 @@ class PostgresSessionManager(RepositorySessionManager, SessionRepository):
             self.logger.error(f"Error deleting agent: {e}")
             raise
 
-    def list_agents(self, session_id: str) -> List[SessionAgent]:
+    @_operation("list_agents")
+    def list_agents(self, session_id: str) -> list[SessionAgent]:
         """
         List all agents for a session.
 
@@ -432,30 +1519,65 @@ class PostgresSessionManager(RepositorySessionManager, SessionRepository):
             Exception: If database operation fails
         """
         try:
-            with Session(self.engine) as db_session:
+            with self._db_session() as db_session:
                 statement = (
-                    select(self.AgentModel)
+                    select(*_agent_columns(self.AgentModel))
                     .where(self.AgentModel.session_id == session_id)
                     .order_by(self.AgentModel.created_at)
                 )
                 result = db_session.exec(statement)
-                agents_db = result.all()
 
-                agents = []
-                for agent_db in agents_db:
-                    agent_data = agent_db.model_dump()
-                    # Map internal_state → _internal_state for SDK
-                    agent_data["_internal_state"] = agent_data.pop("internal_state", {})
-                    agents.append(SessionAgent.from_dict(agent_data))
-
-                return agents
+                return [_session_agent_from_row(row) for row in result.all()]
 
         except Exception as e:
             self.logger.error(f"Error listing agents: {e}")
             raise
 
+    @_operation("find_agents")
+    def find_agents(
+        self,
+        state_contains: dict[str, Any],
+        session_id: str | None = None,
+        limit: int | None = None,
+    ) -> list[tuple[str, SessionAgent]]:
+        """
+        Find agents whose state contains the given JSON document.
+
+        Uses the JSONB containment operator (state @> :document), which can be
+        served by a GIN index on agents.state (see create_gin_indexes).
+
+        Args:
+            state_contains: JSON document the agent state must contain
+            session_id: Restrict the search to one session (default: all sessions)
+            limit: Maximum number of agents to return (None = all)
+
+        Returns:
+            List of (session_id, SessionAgent) tuples
+
+        Raises:
+            Exception: If database operation fails
+        """
+        try:
+            with self._db_session() as db_session:
+                statement = select(
+                    self.AgentModel.session_id, *_agent_columns(self.AgentModel)
+                ).where(col(self.AgentModel.state).contains(state_contains))
+                if session_id is not None:
+                    statement = statement.where(self.AgentModel.session_id == session_id)
+                if limit:
+                    statement = statement.limit(limit)
+
+                result = db_session.exec(statement)
+
+                return [(row.session_id, _session_agent_from_row(row)) for row in result.all()]
+
+        except Exception as e:
+            self.logger.error(f"Error finding agents: {e}")
+            raise
+
     # ==================== Message Methods ====================
 
+    @_operation("create_message", write=True)
     def create_message(
         self, session_id: str, agent_id: str, session_message: SessionMessage, **kwargs
     ) -> None:
@@ -472,22 +1594,26 @@ class PostgresSessionManager(RepositorySessionManager, SessionRepository):
             Exception: If database operation fails
         """
         try:
-            with Session(self.engine) as db_session:
-                message_data = session_message.to_dict()
+            blobs: dict[str, bytes] = {}
+            values = self._message_values(session_id, agent_id, session_message, blobs)
 
-                # Create SQLModel with JSONB fields
-                message_db = self.MessageModel(
-                    message_id=message_data.get("message_id"),
-                    session_id=session_id,
-                    agent_id=agent_id,
-                    message=message_data.get("message"),
-                    redact_message=message_data.get("redact_message"),
-                    created_at=message_data.get("created_at"),
-                    updated_at=message_data.get("updated_at"),
-                )
+            if self.buffer_messages:
+                self._buffer_message(values, blobs)
+                self.logger.debug(f"Message buffered: {session_message.message_id}")
+                return
+
+            with self._db_session() as db_session:
+                self._insert_blobs(db_session, blobs)
 
-                db_session.add(message_db)
-                db_session.commit()
+                # Core INSERT: only the payload columns of enabled features are written
+                db_session.exec(insert_message_statement(self.MessageModel), params=values)
+
+                self._insert_blob_links(
+                    db_session,
+                    self._blob_links(session_id, agent_id, session_message.message_id, blobs),
+                )
+                self._notify(db_session, [("message", session_id, agent_id)])
+                self._commit(db_session)
 
                 self.logger.debug(f"Message created: {session_message.message_id}")
 
@@ -495,9 +1621,10 @@ class PostgresSessionManager(RepositorySessionManager, SessionRepository):
             self.logger.error(f"Error creating message: {e}")
             raise
 
+    @_operation("read_message")
     def read_message(
         self, session_id: str, agent_id: str, message_id: int, **kwargs
-    ) -> Optional[SessionMessage]:
+    ) -> SessionMessage | None:
         """
         Read a message from the database.
 
@@ -514,72 +1641,120 @@ class PostgresSessionManager(RepositorySessionManager, SessionRepository):
             Exception: If database operation fails
         """
         try:
-            with Session(self.engine) as db_session:
-                statement = (
-                    select(self.MessageModel)
-                    .where(self.MessageModel.message_id == message_id)
-                    .where(self.MessageModel.session_id == session_id)
-                    .where(self.MessageModel.agent_id == agent_id)
+            self.flush()
+
+            with self._db_session() as db_session:
+                statement = select_message_statement(
+                    self.MessageModel, payload=self._has_payload_columns()
                 )
-                result = db_session.exec(statement)
-                message_db = result.one_or_none()
+                result = db_session.exec(
+                    statement,
+                    params={
+                        "session_id": session_id,
+                        "agent_id": agent_id,
+                        "message_id": message_id,
+                    },
+                )
+                row = result.one_or_none()
 
-                if message_db:
-                    message_data = message_db.model_dump()
-                    return SessionMessage.from_dict(message_data)
+                if row:
+                    blob_refs: list[BlobRef] = []
+                    message = _session_message_from_row(row, blob_refs)
+                    self._resolve_blobs(db_session, blob_refs)
+                    return message
                 return None
 
         except Exception as e:
             self.logger.error(f"Error reading message: {e}")
             raise
 
-    def update_message(
+    @_operation("update_message")
+    def update_message(  # type: ignore[override]
         self, session_id: str, agent_id: str, session_message: SessionMessage, **kwargs
-    ) -> None:
+    ) -> bool:
         """
         Update an existing message in the database.
 
+        Issues a single UPDATE keyed on (session_id, agent_id, message_id)
+        without reading the stored message first.
+
+        With blob storage the message's blob references are replaced, so
+        blobs only the previous content used (such as redacted images) can
+        be removed by delete_orphaned_blobs.
+
         Args:
             session_id: ID of the parent session
             agent_id: ID of the parent agent
             session_message: Strands SessionMessage object with updated data
             **kwargs: Additional arguments for future extensibility
 
+        Returns:
+            True if the message was updated, False if not found
+
         Raises:
             Exception: If database operation fails
         """
         try:
-            with Session(self.engine) as db_session:
-                statement = (
-                    select(self.MessageModel)
-                    .where(self.MessageModel.message_id == session_message.message_id)
-                    .where(self.MessageModel.session_id == session_id)
-                    .where(self.MessageModel.agent_id == agent_id)
-                )
-                result = db_session.exec(statement)
-                message_db = result.one_or_none()
-
-                if message_db:
-                    message_data = session_message.to_dict()
-
-                    # Update JSONB fields
-                    message_db.message = message_data.get("message")
-                    message_db.redact_message = message_data.get("redact_message")
-                    message_db.updated_at = message_data.get("updated_at")
+            blobs: dict[str, bytes] = {}
+            values = self._message_values(session_id, agent_id, session_message, blobs)
 
-                    db_session.add(message_db)
-                    db_session.commit()
+            with self._buffer_lock:
+                buffered = self._find_buffered_message(
+                    session_id, agent_id, session_message.message_id
+                )
+                if buffered is not None:
+                    # Not written yet: rewrite the pending row and its blob links instead
+                    buffered.update(values)
+                    self._buffered_blob_links = [
+                        link
+                        for link in self._buffered_blob_links
+                        if (link["session_id"], link["agent_id"], link["message_id"])
+                        != (session_id, agent_id, session_message.message_id)
+                    ]
+                    self._buffer_blobs(values, blobs)
+                    self.logger.debug(f"Buffered message updated: {session_message.message_id}")
+                    return True
 
+            links = self._blob_links(session_id, agent_id, session_message.message_id, blobs)
+            if self.compressor is None and self._has_payload_columns():
+                # Drop a payload written by a compressing writer, or it would shadow the message
+                values.update(payload=None, payload_codec=None)
+            for key in ("message_id", "session_id", "agent_id"):
+                values[f"b_{key}"] = values.pop(key)
+            del values["created_at"]
+
+            with self._db_session() as db_session:
+                self._insert_blobs(db_session, blobs)
+
+                # Overwrite JSONB (and payload) fields in place
+                result = db_session.exec(update_message_statement(self.MessageModel), params=values)
+                if result.rowcount:
+                    if self.blob_threshold is not None:
+                        # Blobs the new content no longer references must become orphans
+                        db_session.exec(
+                            delete_message_blob_links_statement(self.MessageBlobModel),
+                            params={
+                                "session_id": session_id,
+                                "agent_id": agent_id,
+                                "message_id": session_message.message_id,
+                            },
+                        )
+                    self._insert_blob_links(db_session, links)
+                    self._notify(db_session, [("message", session_id, agent_id)])
+                self._commit(db_session)
+
+                if result.rowcount:
                     self.logger.debug(f"Message updated: {session_message.message_id}")
-                else:
-                    self.logger.warning(
-                        f"Message {session_message.message_id} not found for update"
-                    )
+                    return True
+
+                self.logger.warning(f"Message {session_message.message_id} not found for update")
+                return False
 
         except Exception as e:
             self.logger.error(f"Error updating message: {e}")
             raise
 
+    @_operation("delete_message")
     def delete_message(self, message_id: str) -> bool:
         """
         Delete a message from the database.
@@ -594,16 +1769,27 @@ class PostgresSessionManager(RepositorySessionManager, SessionRepository):
             Exception: If database operation fails
         """
         try:
-            with Session(self.engine) as db_session:
-                statement = select(self.MessageModel).where(
-                    self.MessageModel.message_id == message_id
-                )
-                result = db_session.exec(statement)
-                message_db = result.one_or_none()
+            self.flush()
 
-                if message_db:
-                    db_session.delete(message_db)
-                    db_session.commit()
+            with self._db_session() as db_session:
+                # Key columns only: the row may lack columns added by later migrations
+                model = self.MessageModel
+                statement = select(model.session_id, model.agent_id).where(
+                    model.message_id == message_id
+                )
+                key = db_session.exec(statement).one_or_none()
+
+                if key:
+                    session_id, agent_id = key
+                    db_session.exec(
+                        delete(model).where(
+                            col(model.session_id) == session_id,
+                            col(model.agent_id) == agent_id,
+                            col(model.message_id) == message_id,
+                        )
+                    )
+                    self._notify(db_session, [("message", session_id, agent_id)])
+                    self._commit(db_session)
                     self.logger.debug(f"Message deleted: {message_id}")
                     return True
 
@@ -613,51 +1799,143 @@ class PostgresSessionManager(RepositorySessionManager, SessionRepository):
             self.logger.error(f"Error deleting message: {e}")
             raise
 
+    @_operation("list_messages")
     def list_messages(
-        self, session_id: str, agent_id: str, limit: Optional[int] = None, offset: int = 0, **kwargs
-    ) -> List[SessionMessage]:
+        self,
+        session_id: str,
+        agent_id: str,
+        limit: int | None = None,
+        offset: int = 0,
+        after_message_id: int | None = None,
+        before_message_id: int | None = None,
+        tail: int | None = None,
+        **kwargs,
+    ) -> list[SessionMessage]:
         """
         List messages for a session and agent with pagination.
 
+        Besides OFFSET pagination, supports keyset pagination: after_message_id
+        and before_message_id filter on the (session_id, agent_id, message_id)
+        primary key, so a page costs the same no matter how deep into the
+        history it is. With before_message_id and a limit, the messages
+        immediately preceding before_message_id are returned.
+
+        With tail=N only the N most recent messages (of those left after
+        offset and the keyset bounds) are read, walking the primary key index
+        backwards.
+
+        While an agent is being restored without an offset and restore_window
+        is set, tail defaults to restore_window.
+
         Args:
             session_id: ID of the parent session
             agent_id: ID of the parent agent
             limit: Maximum number of messages to return (None = all)
             offset: Number of messages to skip
+            after_message_id: Only return messages with a greater message_id
+            before_message_id: Only return messages with a smaller message_id
+            tail: Only return the last N messages (cannot be combined with limit)
             **kwargs: Additional arguments for future extensibility
 
         Returns:
-            List of Strands SessionMessage objects
+            List of Strands SessionMessage objects in ascending message_id order
 
         Raises:
+            ValueError: If tail is not positive or is combined with limit
             Exception: If database operation fails
         """
+        if tail is None and self._restoring and not offset:
+            # The offset is the conversation manager's removed_message_count,
+            # which it keeps counting against the full history
+            tail = self.restore_window
+        if tail is not None:
+            if tail < 1:
+                raise ValueError("tail must be a positive integer")
+            if limit:
+                raise ValueError("tail cannot be combined with limit")
+
         try:
-            with Session(self.engine) as db_session:
-                statement = (
-                    select(self.MessageModel)
-                    .where(self.MessageModel.session_id == session_id)
-                    .where(self.MessageModel.agent_id == agent_id)
-                    .order_by(self.MessageModel.message_id)
+            self.flush()
+
+            # Walk the index backwards when reading the tail or paging towards older messages
+            descending = tail is not None or (
+                before_message_id is not None and after_message_id is None
+            )
+
+            with self._db_session() as db_session:
+                statement = list_messages_statement(
+                    self.MessageModel,
+                    payload=self._has_payload_columns(),
+                    after=after_message_id is not None,
+                    before=before_message_id is not None,
+                    descending=descending,
+                    tail=tail is not None,
+                    offset=bool(offset),
+                    limit=bool(limit),
                 )
-
-                # Apply pagination
-                if offset:
-                    statement = statement.offset(offset)
-                if limit:
-                    statement = statement.limit(limit)
-
-                result = db_session.exec(statement)
-                messages_db = result.all()
-
-                # Convert to SessionMessage
-                messages = []
-                for message_db in messages_db:
-                    message_data = message_db.model_dump()
-                    messages.append(SessionMessage.from_dict(message_data))
+                params = {
+                    "session_id": session_id,
+                    "agent_id": agent_id,
+                    "after_message_id": after_message_id,
+                    "before_message_id": before_message_id,
+                    "offset": offset,
+                    "limit": tail if tail is not None else limit,
+                }
+
+                result = db_session.exec(statement, params=params)
+                rows = result.all()
+                if descending:
+                    rows = reversed(rows)
+
+                blob_refs: list[BlobRef] = []
+                messages = [_session_message_from_row(row, blob_refs) for row in rows]
+                self._resolve_blobs(db_session, blob_refs)
 
                 return messages
 
         except Exception as e:
             self.logger.error(f"Error listing messages: {e}")
             raise
+
+    @_operation("list_messages_page")
+    def list_messages_page(
+        self,
+        session_id: str,
+        agent_id: str,
+        limit: int = 100,
+        after_message_id: int | None = None,
+        before_message_id: int | None = None,
+    ) -> MessagePage:
+        """
+        Read one page of messages using keyset pagination.
+
+        Pass next_cursor of the returned page as after_message_id to read the
+        following page, or previous_cursor as before_message_id to read the
+        preceding one.
+
+        Args:
+            session_id: ID of the parent session
+            agent_id: ID of the parent agent
+            limit: Maximum number of messages in the page
+            after_message_id: Start after this message_id (None = from the start)
+            before_message_id: End before this message_id (None = no upper bound)
+
+        Returns:
+            MessagePage with the messages and continuation cursors
+
+        Raises:
+            ValueError: If limit is not positive
+            Exception: If database operation fails
+        """
+        if limit < 1:
+            raise ValueError("limit must be a positive integer")
+
+        # Read one extra message to know whether another page exists
+        messages = self.list_messages(
+            session_id,
+            agent_id,
+            limit=limit + 1,
+            after_message_id=after_message_id,
+            before_message_id=before_message_id,
+        )
+        return _message_page(messages, limit, after_message_id, before_message_id)
@@ -0,0 +1,261 @@
+"""
+Logging of slow repository operations.
+
+An operation taking longer than the threshold is logged with its duration
+and, for every statement it executed, the SQL, the shape of its parameters
+(names, types and sizes, never values) and the statement duration. For a
+sampled fraction of slow operations, the slowest SELECT is run again under
+EXPLAIN (ANALYZE, BUFFERS) in a background thread and its plan is added to
+the log entry, so a plan change after a table grows shows up without
+reproducing it by hand.
+Repository methods decorated with slow_logged() report to the slow log of
+their session manager.
+"""
+
+import functools
+import logging
+import random
+import threading
+import time
+from collections.abc import Callable
+from typing import Any, TypeVar, cast
+
+from sqlalchemy.engine import Engine
+
+from .query_stats import ExecutedStatement, capturing_statements
+
+
+def parameter_shape(parameters: Any) -> str:
+    """
+    Describe DBAPI parameters without their values.
+
+    Args:
+        parameters: Mapping, sequence, or list of them for executemany
+
+    Returns:
+        Names (or positions) with type names, and lengths of str and bytes
+        values, e.g. "{session_id: str[12], limit: int}"
+    """
+    if isinstance(parameters, list) and parameters and isinstance(parameters[0], (dict, tuple)):
+        return f"{len(parameters)} x {parameter_shape(parameters[0])}"
+    if isinstance(parameters, dict):
+        items = [f"{name}: {_value_shape(value)}" for name, value in parameters.items()]
+        return "{" + ", ".join(items) + "}"
+    if isinstance(parameters, (list, tuple)):
+        return "(" + ", ".join(_value_shape(value) for value in parameters) + ")"
+    return _value_shape(parameters)
+
+
+def _value_shape(value: Any) -> str:
+    if isinstance(value, (str, bytes, bytearray, memoryview)):
+        return f"{type(value).__name__}[{len(value)}]"
+    return type(value).__name__
+
+
+# Functions with side effects that a SELECT may call, such as the cache notifications
+_SIDE_EFFECT_FUNCTIONS = ("PG_NOTIFY(", "PG_ADVISORY", "PG_TRY_ADVISORY", "NEXTVAL(", "SETVAL(")
+
+# Repository method wrapped by a decorator, whose signature the decorator keeps
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+def _explainable(statement: ExecutedStatement) -> bool:
+    """Whether running the statement again under EXPLAIN ANALYZE is safe."""
+    sql = statement.statement.lstrip().upper()
+    # ANALYZE executes the statement: no writes or other side effects, and no row locks
+    # that could wait on the transaction of the operation itself
+    return (
+        not statement.executemany
+        and sql.startswith("SELECT")
+        and " FOR UPDATE" not in sql
+        and " FOR SHARE" not in sql
+        and not any(function in sql for function in _SIDE_EFFECT_FUNCTIONS)
+    )
+
+
+class SlowOperationLog:
+    """
+    Logs repository operations slower than a threshold.
+
+    Plans are captured in a background thread, one at a time, so the
+    operation does not wait for EXPLAIN and at most one extra pooled
+    connection is used for it. The log entry of a sampled operation is
+    written once its plan is captured; an operation sampled while a plan is
+    still being captured is logged without one.
+
+    Attributes:
+        threshold: Duration in seconds from which an operation is logged
+        explain_sample_rate: Fraction of slow operations whose plan is captured
+        explain_timeout: statement_timeout in seconds of the EXPLAIN query
+        logger: Logger receiving the warnings
+    """
+
+    def __init__(
+        self,
+        threshold: float,
+        explain_sample_rate: float = 0.0,
+        explain_timeout: float = 5.0,
+        logger: logging.Logger | None = None,
+    ):
+        """
+        Initialize SlowOperationLog.
+
+        Args:
+            threshold: Duration in seconds from which an operation is logged
+            explain_sample_rate: Fraction (0 to 1) of slow operations whose
+                slowest SELECT is explained (default: 0.0 = never)
+            explain_timeout: statement_timeout in seconds of the EXPLAIN
+                query (default: 5.0)
+            logger: Logger receiving the warnings (default: module logger)
+
+        Raises:
+            ValueError: If threshold is negative or explain_sample_rate is not
+                between 0 and 1
+        """
+        if threshold < 0:
+            raise ValueError("slow operation threshold must not be negative")
+        if not 0.0 <= explain_sample_rate <= 1.0:
+            raise ValueError("explain_sample_rate must be between 0 and 1")
+
+        self.threshold = threshold
+        self.explain_sample_rate = explain_sample_rate
+        self.explain_timeout = explain_timeout
+        self.logger = logger or logging.getLogger(__name__)
+        self._explain_thread: threading.Thread | None = None
+        self._explain_lock = threading.Lock()
+
+    def record(
+        self,
+        engine: Engine,
+        operation: str,
+        duration: float,
+        statements: list[ExecutedStatement],
+    ) -> None:
+        """
+        Log the operation if it reached the threshold, with a sampled plan.
+
+        Never raises: failing to capture a plan is logged and ignored.
+
+        Args:
+            engine: Engine the operation ran on, used to run EXPLAIN
+            operation: Repository operation name
+            duration: Seconds the operation took
+            statements: Statements the operation executed
+        """
+        if duration < self.threshold:
+            return
+
+        lines = [
+            (
+                f"Slow session operation {operation}: {duration * 1000:.1f} ms, "
+                f"{len(statements)} statements"
+            )
+        ]
+        for statement in statements:
+            lines.append(
+                f"  {statement.duration * 1000:.1f} ms: {' '.join(statement.statement.split())}"
+                f" -- parameters {parameter_shape(statement.parameters)}"
+            )
+
+        explainable = [statement for statement in statements if _explainable(statement)]
+        if explainable and random.random() < self.explain_sample_rate:
+            slowest = max(explainable, key=lambda statement: statement.duration)
+            with self._explain_lock:
+                if self._explain_thread is None or not self._explain_thread.is_alive():
+                    self._explain_thread = threading.Thread(
+                        target=self._log_with_plan,
+                        args=(engine, slowest, lines),
+                        name="postgres-session-explain",
+                        daemon=True,
+                    )
+                    self._explain_thread.start()
+                    return
+            lines.append("  plan skipped: a previous EXPLAIN is still running")
+
+        self.logger.warning("\n".join(lines))
+
+    def join(self, timeout: float | None = None) -> None:
+        """
+        Wait for the plan being captured in the background, if any.
+
+        Args:
+            timeout: Seconds to wait at most (default: None = until done)
+        """
+        thread = self._explain_thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def _log_with_plan(
+        self, engine: Engine, statement: ExecutedStatement, lines: list[str]
+    ) -> None:
+        lines.append("  EXPLAIN (ANALYZE, BUFFERS) of the slowest SELECT:")
+        try:
+            plan = self.explain(engine, statement)
+        except Exception as e:
+            lines.append(f"    plan unavailable: {e}")
+            self.logger.warning("\n".join(lines), exc_info=True)
+            return
+        lines.extend(f"    {line}" for line in plan)
+        self.logger.warning("\n".join(lines))
+
+    def explain(self, engine: Engine, statement: ExecutedStatement) -> list[str]:
+        """
+        Run a SELECT again under EXPLAIN (ANALYZE, BUFFERS) and return its plan.
+
+        The statement runs on its own connection, in a transaction that is
+        rolled back, so it does not see uncommitted writes of a unit of work.
+
+        Args:
+            engine: Engine to run EXPLAIN on
+            statement: Captured SELECT statement
+
+        Returns:
+            Lines of the text plan
+
+        Raises:
+            Exception: If database operation fails
+        """
+        with engine.connect() as connection:
+            connection.exec_driver_sql(
+                f"SET LOCAL statement_timeout = {int(self.explain_timeout * 1000)}"
+            )
+            result = connection.exec_driver_sql(
+                f"EXPLAIN (ANALYZE, BUFFERS) {statement.statement}", statement.parameters
+            )
+            plan = [row[0] for row in result]
+            connection.rollback()
+        return plan
+
+
+def slow_logged(operation: str) -> Callable[[F], F]:
+    """
+    Report the duration and statements of a sync repository method to its slow log.
+
+    The repository's slow_log attribute holds a SlowOperationLog, or None to
+    call the method without overhead. Apply it outside counted() so that
+    EXPLAIN queries are not counted into the operation's stats.
+
+    Args:
+        operation: Operation name, used in the log entry
+
+    Returns:
+        Decorator
+    """
+
+    def decorator(method: F) -> F:
+        @functools.wraps(method)
+        def wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:
+            slow_log = getattr(self, "slow_log", None)
+            if slow_log is None:
+                return method(self, *args, **kwargs)
+
+            started = time.perf_counter()
+            try:
+                with capturing_statements() as statements:
+                    return method(self, *args, **kwargs)
+            finally:
+                slow_log.record(self.engine, operation, time.perf_counter() - started, statements)
+
+        return cast(F, wrapper)
+
+    return decorator
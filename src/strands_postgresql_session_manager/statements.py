@@ -0,0 +1,240 @@
+"""
+Prebuilt statements for the PostgreSQL session repositories.
+
+Repository methods run the same few statements over and over with different
+values. They are built here once per model class with bound parameters and
+reused, so a call neither constructs a select(...).where(...) chain nor
+generates its SQLAlchemy cache key again (cache keys are memoized on the
+statement object), and every call sends the same SQL text, which lets
+drivers with server-side prepared statements (psycopg 3, asyncpg) reuse
+their plans.
+
+Bound parameter names are those of the columns; WHERE clauses of UPDATE
+statements use a "b_" prefix since the column names are taken by SET.
+"""
+
+from functools import cache
+from typing import Any
+
+from sqlalchemy import Integer, Text, bindparam, delete, func, insert, update
+from sqlalchemy.dialects.postgresql import ARRAY, insert as pg_insert
+from sqlmodel import col, select
+
+from .models import AgentDB, MessageBlobDB, MessageDB, SessionDB
+
+# SELECT pg_notify(:channel, payload) FROM unnest(:payloads) AS payload
+_NOTIFY_STATEMENT = select(
+    func.pg_notify(
+        bindparam("channel"),
+        func.unnest(bindparam("payloads", type_=ARRAY(Text)))
+        .table_valued("payload")
+        .render_derived()
+        .c.payload,
+    )
+)
+
+
+def _agent_columns(agent_model: type[AgentDB], version: bool = False) -> tuple[Any, ...]:
+    """Columns of agent_model read by _session_agent_from_row."""
+    columns: tuple[Any, ...] = (
+        agent_model.agent_id,
+        agent_model.state,
+        agent_model.conversation_manager_state,
+        agent_model.internal_state,
+        agent_model.created_at,
+        agent_model.updated_at,
+    )
+    if version:
+        columns += (agent_model.version,)
+    return columns
+
+
+def _message_columns(message_model: type[MessageDB], payload: bool = False) -> tuple[Any, ...]:
+    """Columns of message_model read by _session_message_from_row."""
+    columns: tuple[Any, ...] = (
+        message_model.message_id,
+        message_model.message,
+        message_model.redact_message,
+        message_model.created_at,
+        message_model.updated_at,
+    )
+    if payload:
+        columns += (message_model.payload, message_model.payload_codec)
+    return columns
+
+
+# ==================== Session Statements ====================
+
+
+@cache
+def insert_session_statement(session_model: type[SessionDB]) -> Any:
+    """INSERT a session unless it exists, returning its id if it was created."""
+    return (
+        pg_insert(session_model)
+        .values(
+            session_id=bindparam("session_id"),
+            session_type=bindparam("session_type"),
+            created_at=bindparam("created_at"),
+            updated_at=bindparam("updated_at"),
+        )
+        .on_conflict_do_nothing(index_elements=["session_id"])
+        .returning(col(session_model.session_id))
+    )
+
+
+@cache
+def select_session_statement(session_model: type[SessionDB], column: str | None = None) -> Any:
+    """SELECT a session by :session_id (only column, if given)."""
+    selected = session_model if column is None else getattr(session_model, column)
+    return select(selected).where(session_model.session_id == bindparam("session_id"))
+
+
+# ==================== Agent Statements ====================
+
+
+@cache
+def select_agent_statement(agent_model: type[AgentDB], version: bool = False) -> Any:
+    """SELECT the columns of an agent by :session_id and :agent_id."""
+    return select(*_agent_columns(agent_model, version)).where(
+        agent_model.agent_id == bindparam("agent_id"),
+        agent_model.session_id == bindparam("session_id"),
+    )
+
+
+@cache
+def select_agent_column_statement(agent_model: type[AgentDB], column: str) -> Any:
+    """SELECT one column of an agent by :session_id and :agent_id."""
+    return select(getattr(agent_model, column)).where(
+        agent_model.agent_id == bindparam("agent_id"),
+        agent_model.session_id == bindparam("session_id"),
+    )
+
+
+@cache
+def update_agent_statement(
+    agent_model: type[AgentDB], versioned: bool = False, expect_version: bool = False
+) -> Any:
+    """
+    UPDATE the state of an agent by :b_session_id and :b_agent_id.
+
+    Versioned updates increment the version column and return the new
+    version; with expect_version they only apply while the version is still
+    :expected_version (compare-and-set).
+    """
+    statement = (
+        update(agent_model)
+        .where(col(agent_model.agent_id) == bindparam("b_agent_id"))
+        .where(col(agent_model.session_id) == bindparam("b_session_id"))
+        .values(
+            state=bindparam("state"),
+            conversation_manager_state=bindparam("conversation_manager_state"),
+            internal_state=bindparam("internal_state"),
+            updated_at=bindparam("updated_at"),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    if versioned:
+        version = col(agent_model.version)
+        statement = statement.values(version=version + 1).returning(version)
+    if expect_version:
+        statement = statement.where(col(agent_model.version) == bindparam("expected_version"))
+    return statement
+
+
+# ==================== Message Statements ====================
+
+
+@cache
+def insert_message_statement(message_model: type[MessageDB]) -> Any:
+    """INSERT a message; only the columns present in the parameters are written."""
+    return insert(message_model)
+
+
+@cache
+def select_message_statement(message_model: type[MessageDB], payload: bool = False) -> Any:
+    """SELECT the columns of a message by :session_id, :agent_id and :message_id."""
+    return select(*_message_columns(message_model, payload)).where(
+        message_model.message_id == bindparam("message_id"),
+        message_model.session_id == bindparam("session_id"),
+        message_model.agent_id == bindparam("agent_id"),
+    )
+
+
+@cache
+def update_message_statement(message_model: type[MessageDB]) -> Any:
+    """
+    UPDATE a message by :b_session_id, :b_agent_id and :b_message_id.
+
+    The columns set are those present in the parameters.
+    """
+    return (
+        update(message_model)
+        .where(col(message_model.message_id) == bindparam("b_message_id"))
+        .where(col(message_model.session_id) == bindparam("b_session_id"))
+        .where(col(message_model.agent_id) == bindparam("b_agent_id"))
+        .execution_options(synchronize_session=False)
+    )
+
+
+@cache
+def delete_message_blob_links_statement(message_blob_model: type[MessageBlobDB]) -> Any:
+    """DELETE the blob references of a message by :session_id, :agent_id and :message_id."""
+    return delete(message_blob_model).where(
+        col(message_blob_model.session_id) == bindparam("session_id"),
+        col(message_blob_model.agent_id) == bindparam("agent_id"),
+        col(message_blob_model.message_id) == bindparam("message_id"),
+    )
+
+
+@cache
+def list_messages_statement(
+    message_model: type[MessageDB],
+    payload: bool = False,
+    after: bool = False,
+    before: bool = False,
+    descending: bool = False,
+    tail: bool = False,
+    offset: bool = False,
+    limit: bool = False,
+) -> Any:
+    """
+    SELECT the messages of :session_id and :agent_id, in one of the shapes of list_messages.
+
+    Flags add :after_message_id and :before_message_id bounds, descending
+    order, and :offset / :limit pagination; with tail, :limit is the tail
+    size and :offset is applied with a subquery on the first message kept.
+    """
+    statement = select(*_message_columns(message_model, payload)).where(
+        message_model.session_id == bindparam("session_id"),
+        message_model.agent_id == bindparam("agent_id"),
+    )
+
+    # Keyset bounds
+    if after:
+        statement = statement.where(message_model.message_id > bindparam("after_message_id"))
+    if before:
+        statement = statement.where(message_model.message_id < bindparam("before_message_id"))
+
+    if descending:
+        statement = statement.order_by(col(message_model.message_id).desc())
+    else:
+        statement = statement.order_by(message_model.message_id)
+
+    if tail and offset:
+        # Keep only messages from the first one not skipped by offset
+        first_message_id = (
+            select(message_model.message_id)
+            .where(message_model.session_id == bindparam("session_id"))
+            .where(message_model.agent_id == bindparam("agent_id"))
+            .order_by(col(message_model.message_id))
+            .offset(bindparam("offset", type_=Integer))
+            .limit(1)
+            .scalar_subquery()
+        )
+        statement = statement.where(message_model.message_id >= first_message_id)
+    elif offset:
+        statement = statement.offset(bindparam("offset", type_=Integer))
+    if tail or limit:
+        statement = statement.limit(bindparam("limit", type_=Integer))
+
+    return statement
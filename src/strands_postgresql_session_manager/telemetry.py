@@ -0,0 +1,255 @@
+"""
+OpenTelemetry instrumentation of the session repositories.
+
+With telemetry enabled, every repository operation runs in a span carrying
+the session id, agent id, number of rows and payload bytes, and records its
+duration and payload size in histograms. Payload bytes are counted by the
+JSONB codec (see counting_json_bytes) as the operation's queries serialize
+and decode documents, so nothing is serialized again to measure them. Spans nest under the Strands agent
+spans of the same thread, so a slow turn shows which storage call was slow.
+
+Only the OpenTelemetry API is used; install and configure the SDK (or the
+exporter of your choice) to collect the data. Without the API installed,
+enabling telemetry raises ImportError.
+
+Install the API with: pip install "strands-postgresql-session-manager[otel]"
+"""
+
+import functools
+import inspect
+import threading
+import time
+from collections.abc import Callable
+from typing import Any, TypeVar, cast
+
+from .engine import counting_json_bytes
+
+try:
+    from opentelemetry import metrics, trace
+    from opentelemetry.trace import SpanKind, Status, StatusCode
+except ImportError:  # pragma: no cover - depends on installed extras
+    trace = None  # type: ignore[assignment]
+
+INSTRUMENTATION_NAME = "strands_postgresql_session_manager"
+
+# Repository method wrapped by a decorator, whose signature the decorator keeps
+F = TypeVar("F", bound=Callable[..., Any])
+
+# Arguments identifying what an operation works on: span attribute and field of the argument
+_ID_ARGUMENTS = {
+    "session_id": ("strands.session.id", None),
+    "session": ("strands.session.id", "session_id"),
+    "agent_id": ("strands.agent.id", None),
+    "session_agent": ("strands.agent.id", "agent_id"),
+    "message_id": ("strands.message.id", None),
+    "session_message": ("strands.message.id", "message_id"),
+}
+
+
+def result_rows(result: Any, write: bool = False) -> int:
+    """
+    Count the rows returned or written by an operation from its result.
+
+    Args:
+        result: Return value of the operation
+        write: Whether the operation writes one row and returns nothing
+
+    Returns:
+        Number of rows
+    """
+    if result is None:
+        return 1 if write else 0
+    if isinstance(result, bool):
+        return int(result)
+    if isinstance(result, int):
+        return result
+    if isinstance(result, (list, tuple)):
+        return len(result)
+    if hasattr(result, "messages"):
+        return len(result.messages)
+    return 1
+
+
+class RepositoryTelemetry:
+    """
+    Tracer and instruments recording repository operations.
+
+    Attributes:
+        tracer: OpenTelemetry tracer for operation spans
+        duration: Histogram of operation durations in seconds
+        payload: Histogram of payload bytes per operation
+    """
+
+    def __init__(self, tracer_provider: Any = None, meter_provider: Any = None):
+        """
+        Initialize RepositoryTelemetry.
+
+        Args:
+            tracer_provider: OpenTelemetry TracerProvider (default: global provider)
+            meter_provider: OpenTelemetry MeterProvider (default: global provider)
+
+        Raises:
+            ImportError: If the OpenTelemetry API is not installed
+        """
+        if trace is None:
+            raise ImportError(
+                "telemetry requires the 'otel' extra: "
+                'pip install "strands-postgresql-session-manager[otel]"'
+            )
+
+        self.tracer = trace.get_tracer(INSTRUMENTATION_NAME, tracer_provider=tracer_provider)
+        meter = metrics.get_meter(INSTRUMENTATION_NAME, meter_provider=meter_provider)
+        self.duration = meter.create_histogram(
+            "strands.session.operation.duration",
+            unit="s",
+            description="Duration of session repository operations",
+        )
+        self.payload = meter.create_histogram(
+            "strands.session.operation.payload.size",
+            unit="By",
+            description="JSON payload written or read by session repository operations",
+        )
+
+    def start_span(self, operation: str, attributes: dict[str, Any]) -> Any:
+        """Start the span of an operation, as a context manager."""
+        return self.tracer.start_as_current_span(
+            f"session_repository.{operation}",
+            kind=SpanKind.CLIENT,
+            attributes=attributes,
+            record_exception=False,
+            set_status_on_exception=False,
+        )
+
+    def finish(
+        self,
+        span: Any,
+        operation: str,
+        started: float,
+        result: Any = None,
+        payload: int = 0,
+        write: bool = False,
+        error: BaseException | None = None,
+    ) -> None:
+        """Record the outcome and JSON payload bytes of an operation on its span and histograms."""
+        metric_attributes = {"db.operation.name": operation}
+        if error is not None:
+            metric_attributes["error.type"] = type(error).__name__
+            span.record_exception(error)
+            span.set_status(Status(StatusCode.ERROR, str(error)))
+        else:
+            span.set_attribute("strands.session.rows", result_rows(result, write))
+            span.set_attribute("strands.session.payload_bytes", payload)
+            self.payload.record(payload, metric_attributes)
+        self.duration.record(time.perf_counter() - started, metric_attributes)
+
+
+_default_telemetry: RepositoryTelemetry | None = None
+_default_telemetry_lock = threading.Lock()
+
+
+def default_telemetry() -> RepositoryTelemetry:
+    """
+    Return the telemetry using the global OpenTelemetry providers, creating it on first use.
+
+    Returns:
+        RepositoryTelemetry shared by all repositories
+
+    Raises:
+        ImportError: If the OpenTelemetry API is not installed
+    """
+    global _default_telemetry
+    with _default_telemetry_lock:
+        if _default_telemetry is None:
+            _default_telemetry = RepositoryTelemetry()
+        return _default_telemetry
+
+
+def instrumented(operation: str, write: bool = False) -> Callable[[F], F]:
+    """
+    Trace a repository method when its repository has telemetry enabled.
+
+    The repository's telemetry attribute holds a RepositoryTelemetry, or
+    None to call the method without overhead. Works for sync methods and
+    coroutines.
+
+    Args:
+        operation: Operation name, used in the span name and metric attributes
+        write: Whether the method writes one row and returns nothing
+
+    Returns:
+        Decorator
+    """
+
+    def decorator(method: F) -> F:
+        # Positions of the arguments identifying the session and agent, without self
+        parameters = list(inspect.signature(method).parameters)[1:]
+        id_arguments = [
+            (name, parameters.index(name), *_ID_ARGUMENTS[name])
+            for name in _ID_ARGUMENTS
+            if name in parameters
+        ]
+
+        def argument(args: tuple, kwargs: dict[str, Any], name: str, index: int) -> Any:
+            return args[index] if index < len(args) else kwargs.get(name)
+
+        def span_attributes(self: Any, args: tuple, kwargs: dict[str, Any]) -> dict[str, Any]:
+            attributes = {"db.system.name": "postgresql", "db.operation.name": operation}
+            for name, index, key, field in id_arguments:
+                value = argument(args, kwargs, name, index)
+                if field is not None:
+                    value = getattr(value, field, None)
+                if value is not None:
+                    attributes[key] = value
+            if "strands.session.id" not in attributes and getattr(self, "session_id", None):
+                attributes["strands.session.id"] = self.session_id
+            return attributes
+
+        if inspect.iscoroutinefunction(method):
+
+            @functools.wraps(method)
+            async def async_wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:
+                telemetry = self.telemetry
+                if telemetry is None:
+                    return await method(self, *args, **kwargs)
+
+                with (
+                    telemetry.start_span(operation, span_attributes(self, args, kwargs)) as span,
+                    counting_json_bytes() as payload,
+                ):
+                    started = time.perf_counter()
+                    try:
+                        result = await method(self, *args, **kwargs)
+                    except BaseException as e:
+                        telemetry.finish(span, operation, started, error=e)
+                        raise
+                    telemetry.finish(
+                        span, operation, started, result, payload.dumped + payload.loaded, write
+                    )
+                    return result
+
+            return cast(F, async_wrapper)
+
+        @functools.wraps(method)
+        def wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:
+            telemetry = self.telemetry
+            if telemetry is None:
+                return method(self, *args, **kwargs)
+
+            with (
+                telemetry.start_span(operation, span_attributes(self, args, kwargs)) as span,
+                counting_json_bytes() as payload,
+            ):
+                started = time.perf_counter()
+                try:
+                    result = method(self, *args, **kwargs)
+                except BaseException as e:
+                    telemetry.finish(span, operation, started, error=e)
+                    raise
+                telemetry.finish(
+                    span, operation, started, result, payload.dumped + payload.loaded, write
+                )
+                return result
+
+        return cast(F, wrapper)
+
+    return decorator
@@ -19,19 +19,25 @@ Cleanup:
     docker stop postgres-test && docker rm postgres-test
 """
 
-import pytest
 import os
 from datetime import datetime
-from sqlmodel import create_engine, SQLModel, Session, text
 from unittest.mock import MagicMock
 
+import pytest
+from sqlmodel import Session, SQLModel, create_engine, text
+
 from strands_postgresql_session_manager import (
+    AgentDB,
+    AgentVersionConflictError,
     PostgresSessionManager,
     SessionDB,
-    AgentDB,
+    SessionLease,
+    SessionLeaseUnavailableError,
+    create_gin_indexes,
+    delete_orphaned_blobs,
+    migrate_json_to_jsonb,
 )
 
-
 # Skip integration tests if DATABASE_URL not set
 pytestmark = pytest.mark.skipif(
     not os.getenv("DATABASE_URL"),
@@ -64,6 +70,7 @@ def cleanup_database(engine):
         session.exec(text("DELETE FROM messages"))
         session.exec(text("DELETE FROM agents"))
         session.exec(text("DELETE FROM sessions"))
+        session.exec(text("DELETE FROM blobs"))
         session.commit()
 
 
@@ -229,6 +236,108 @@ class TestConcurrentSessions:
             assert session_1 is None
             assert session_2 is not None
 
+    def test_concurrent_session_creation(self, engine):
+        """Test that concurrent first requests for the same session don't conflict."""
+        from concurrent.futures import ThreadPoolExecutor
+
+        def create_manager(_):
+            return PostgresSessionManager(session_id="race_session", engine=engine)
+
+        # Every worker sees the session as missing and tries to create it
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            managers = list(executor.map(create_manager, range(8)))
+
+        assert len(managers) == 8
+
+        with Session(engine) as db_session:
+            count = db_session.exec(
+                text("SELECT COUNT(*) FROM sessions WHERE session_id = 'race_session'")
+            ).one()
+            assert count[0] == 1
+
+    def test_bulk_delete_sessions(self, engine):
+        """Test deleting many sessions in batches cascades to agents."""
+        sm = PostgresSessionManager(session_id="purge_0", engine=engine)
+
+        session_ids = [f"purge_{i}" for i in range(5)]
+        for sid in session_ids:
+            mock_session = MagicMock()
+            mock_session.session_id = sid
+            mock_session.to_dict.return_value = {
+                "session_id": sid,
+                "session_type": "AGENT",
+                "created_at": datetime.utcnow(),
+                "updated_at": datetime.utcnow(),
+            }
+            sm.create_session(mock_session)
+
+            mock_agent = MagicMock()
+            mock_agent.agent_id = "agent_main"
+            mock_agent.to_dict.return_value = {
+                "agent_id": "agent_main",
+                "state": {},
+                "conversation_manager_state": {},
+                "_internal_state": {},
+                "created_at": datetime.utcnow(),
+                "updated_at": datetime.utcnow(),
+            }
+            sm.create_agent(sid, mock_agent)
+
+        deleted = sm.delete_sessions(session_ids + ["purge_missing"], batch_size=2)
+        assert deleted == 5
+
+        with Session(engine) as db_session:
+            remaining = db_session.exec(
+                text("SELECT COUNT(*) FROM agents WHERE session_id LIKE 'purge_%'")
+            ).one()
+            assert remaining[0] == 0
+
+
+class TestUnitOfWork:
+    """Test turn-level transactions."""
+
+    def test_unit_of_work_is_atomic(self, session_manager, engine):
+        """Test that a failed unit of work persists nothing and a successful one everything."""
+        mock_agent = MagicMock()
+        mock_agent.agent_id = "agent_main"
+        mock_agent.to_dict.return_value = {
+            "agent_id": "agent_main",
+            "state": {},
+            "conversation_manager_state": {},
+            "_internal_state": {},
+            "created_at": datetime.utcnow(),
+            "updated_at": datetime.utcnow(),
+        }
+
+        def create_message(message_id):
+            mock_message = MagicMock()
+            mock_message.message_id = message_id
+            mock_message.to_dict.return_value = {
+                "message_id": message_id,
+                "message": {"role": "user", "content": [{"text": f"Message {message_id}"}]},
+                "redact_message": None,
+                "created_at": datetime.utcnow(),
+                "updated_at": datetime.utcnow(),
+            }
+            session_manager.create_message("integration_test_session", "agent_main", mock_message)
+
+        with pytest.raises(RuntimeError), session_manager.unit_of_work():
+            session_manager.create_agent("integration_test_session", mock_agent)
+            create_message(0)
+            raise RuntimeError("turn failed")
+
+        assert session_manager.read_agent("integration_test_session", "agent_main") is None
+
+        with session_manager.unit_of_work():
+            session_manager.create_agent("integration_test_session", mock_agent)
+            create_message(0)
+            create_message(1)
+            # Reads inside the unit of work see its own writes
+            assert len(session_manager.list_messages("integration_test_session", "agent_main")) == 2
+
+        messages = session_manager.list_messages("integration_test_session", "agent_main")
+        assert [message.message_id for message in messages] == [0, 1]
+
 
 class TestJSONBStorage:
     """Test JSONB column storage and retrieval."""
@@ -291,6 +400,203 @@ class TestJSONBStorage:
             assert agent_db.state["workflow"]["steps_completed"] == [1, 2, 3]
             assert agent_db.state["metrics"]["messages_sent"] == 42
 
+    def test_state_containment_query(self, session_manager, engine):
+        """Test JSONB containment queries on agent state with a GIN index."""
+        for agent_id, tier in [("agent_pro", "pro"), ("agent_free", "free")]:
+            mock_agent = MagicMock()
+            mock_agent.agent_id = agent_id
+            mock_agent.to_dict.return_value = {
+                "agent_id": agent_id,
+                "state": {"tier": tier, "features": ["search"]},
+                "conversation_manager_state": {},
+                "_internal_state": {},
+                "created_at": datetime.utcnow(),
+                "updated_at": datetime.utcnow(),
+            }
+            session_manager.create_agent("integration_test_session", mock_agent)
+
+        assert create_gin_indexes(engine) == ["ix_agents_state_gin"]
+        # Already migrated tables are left untouched
+        assert migrate_json_to_jsonb(engine) == []
+
+        with Session(engine) as db_session:
+            data_type = db_session.exec(
+                text(
+                    "SELECT data_type FROM information_schema.columns "
+                    "WHERE table_name = 'agents' AND column_name = 'state'"
+                )
+            ).one()
+            assert data_type[0] == "jsonb"
+
+        result = session_manager.find_agents({"tier": "pro"})
+
+        assert len(result) == 1
+        assert result[0][0] == "integration_test_session"
+        assert result[0][1].agent_id == "agent_pro"
+
+
+class TestCompression:
+    """Test compressed message storage."""
+
+    def test_compressed_message_round_trip(self, engine):
+        """Test that large messages are stored compressed and read back transparently."""
+        pytest.importorskip("zstandard")
+        session_manager = PostgresSessionManager(
+            session_id="compressed_session", engine=engine, compression="zstd"
+        )
+
+        mock_agent = MagicMock()
+        mock_agent.agent_id = "agent_main"
+        mock_agent.to_dict.return_value = {
+            "agent_id": "agent_main",
+            "state": {},
+            "conversation_manager_state": {},
+            "_internal_state": {},
+            "created_at": datetime.utcnow(),
+            "updated_at": datetime.utcnow(),
+        }
+        session_manager.create_agent("compressed_session", mock_agent)
+
+        content = {"role": "user", "content": [{"text": "search result " * 5000}]}
+        mock_message = MagicMock()
+        mock_message.message_id = 0
+        mock_message.to_dict.return_value = {
+            "message_id": 0,
+            "message": content,
+            "redact_message": None,
+            "created_at": datetime.utcnow(),
+            "updated_at": datetime.utcnow(),
+        }
+        session_manager.create_message("compressed_session", "agent_main", mock_message)
+
+        with Session(engine) as session:
+            row = session.exec(
+                text(
+                    "SELECT message, payload_codec, octet_length(payload) FROM messages "
+                    "WHERE session_id = 'compressed_session'"
+                )
+            ).one()
+        assert row[0] is None
+        assert row[1] == "zstd"
+        assert row[2] < 10000
+
+        messages = session_manager.list_messages("compressed_session", "agent_main")
+        assert messages[0].message == content
+
+
+class TestOptimisticLocking:
+    """Test compare-and-set agent updates."""
+
+    def test_concurrent_update_conflicts(self, engine):
+        """Test that the second of two updates based on the same version is rejected."""
+        worker_1 = PostgresSessionManager(
+            session_id="locking_session", engine=engine, optimistic_locking=True
+        )
+        worker_2 = PostgresSessionManager(
+            session_id="locking_session", engine=engine, optimistic_locking=True
+        )
+
+        mock_agent = MagicMock()
+        mock_agent.agent_id = "agent_main"
+        mock_agent.to_dict.return_value = {
+            "agent_id": "agent_main",
+            "state": {"turn": 0},
+            "conversation_manager_state": {},
+            "_internal_state": {},
+            "created_at": datetime.utcnow(),
+            "updated_at": datetime.utcnow(),
+        }
+        worker_1.create_agent("locking_session", mock_agent)
+        worker_2.read_agent("locking_session", "agent_main")
+
+        worker_1.update_agent("locking_session", mock_agent)
+
+        with pytest.raises(AgentVersionConflictError) as conflict:
+            worker_2.update_agent("locking_session", mock_agent)
+        assert conflict.value.expected_version == 1
+        assert conflict.value.actual_version == 2
+
+        # After re-reading, the update applies
+        worker_2.read_agent("locking_session", "agent_main")
+        worker_2.update_agent("locking_session", mock_agent)
+
+        with Session(engine) as session:
+            agent_db = session.get(
+                AgentDB, {"session_id": "locking_session", "agent_id": "agent_main"}
+            )
+            assert agent_db.version == 3
+
+
+class TestSessionLeases:
+    """Test advisory-lock session leases."""
+
+    def test_lease_is_exclusive(self, engine):
+        """Test that a held lease blocks other workers until released."""
+        worker_1 = SessionLease(engine, "lease_session")
+        worker_2 = SessionLease(engine, "lease_session")
+
+        assert worker_1.try_acquire()
+        worker_1.renew()
+
+        assert not worker_2.try_acquire()
+        with pytest.raises(SessionLeaseUnavailableError):
+            worker_2.acquire(timeout=0.2)
+
+        worker_1.release()
+        with worker_2.acquire(timeout=1):
+            assert not worker_1.try_acquire()
+        assert worker_1.try_acquire()
+        worker_1.release()
+
+
+class TestBlobStore:
+    """Test content-addressed storage of binary content blocks."""
+
+    def test_blobs_are_deduplicated_and_collected(self, engine):
+        """Test that a re-sent image is stored once, read back, and collected when unused."""
+        from strands.types.session import SessionMessage
+
+        session_manager = PostgresSessionManager(
+            session_id="blob_session", engine=engine, blob_threshold=1024
+        )
+
+        mock_agent = MagicMock()
+        mock_agent.agent_id = "agent_main"
+        mock_agent.to_dict.return_value = {
+            "agent_id": "agent_main",
+            "state": {},
+            "conversation_manager_state": {},
+            "_internal_state": {},
+            "created_at": datetime.utcnow(),
+            "updated_at": datetime.utcnow(),
+        }
+        session_manager.create_agent("blob_session", mock_agent)
+
+        image = bytes(range(256)) * 64
+        for index in range(2):
+            message = SessionMessage.from_message(
+                message={
+                    "role": "user",
+                    "content": [{"image": {"format": "png", "source": {"bytes": image}}}],
+                },
+                index=index,
+            )
+            session_manager.create_message("blob_session", "agent_main", message)
+
+        with Session(engine) as session:
+            assert session.exec(text("SELECT count(*) FROM blobs")).one()[0] == 1
+
+        messages = session_manager.list_messages("blob_session", "agent_main")
+        assert [m.message["content"][0]["image"]["source"]["bytes"] for m in messages] == [
+            image,
+            image,
+        ]
+
+        # Still referenced until the session is gone
+        assert delete_orphaned_blobs(engine) == 0
+        session_manager.delete_session("blob_session")
+        assert delete_orphaned_blobs(engine) == 1
+
 
 class TestPerformance:
     """Test performance with larger datasets."""
@@ -352,3 +658,32 @@ class TestPerformance:
         assert len(page_1) == 100
         assert len(page_2) == 100
         assert page_1[0].message_id != page_2[0].message_id
+
+        # Keyset pagination walks the whole history without OFFSET
+        seen = []
+        cursor = None
+        while True:
+            page = session_manager.list_messages_page(
+                "integration_test_session", "agent_main", limit=250, after_message_id=cursor
+            )
+            seen.extend(message.message_id for message in page.messages)
+            if page.next_cursor is None:
+                break
+            cursor = page.next_cursor
+
+        assert seen == list(range(1, num_messages + 1))
+
+        # Paging backwards returns the messages right before the cursor
+        previous = session_manager.list_messages(
+            "integration_test_session", "agent_main", limit=10, before_message_id=501
+        )
+        assert [message.message_id for message in previous] == list(range(491, 501))
+
+        # Tail window reads only the most recent messages
+        tail = session_manager.list_messages("integration_test_session", "agent_main", tail=10)
+        assert [message.message_id for message in tail] == list(range(991, 1001))
+
+        tail = session_manager.list_messages(
+            "integration_test_session", "agent_main", offset=995, tail=10
+        )
+        assert [message.message_id for message in tail] == list(range(996, 1001))